@@ -5,6 +5,15 @@ Fecha: [16/03/2025]
 
 """
 import time
+import io
+import os
+import random
+import sys
+import tracemalloc
+from array import array
+from contextlib import redirect_stdout
+
+from consultas_lote import bfsMultiorigen, consultasLote, resolverGrupos, transponer
 
 class NodoUbicacion:
     """**Clase NodoUbicacion**
@@ -25,14 +34,316 @@ class NodoUbicacion:
         if nombreDestino not in self.rutas:
             self.rutas.append(nombreDestino)
 
+class PoolUbicaciones:
+    """**Clase PoolUbicaciones**
+    
+    Almacenamiento compacto de nodos en arreglos paralelos.
+    
+    Cada nodo es un índice (slot): su nombre es una referencia en la lista
+    ``nombre`` (la misma cadena recibida, sin tablas de nombres), ``siguiente``
+    y ``anterior`` son otros slots (-1 = ninguno) y sus rutas forman una cadena
+    de celdas en ``ruta_destino`` y ``ruta_siguiente``. Los slots libres tienen
+    nombre None y enlaces -2, así que las búsquedas en C (``list.index``,
+    ``array.index``) solo encuentran nodos vivos. Slots y celdas liberados se
+    reutilizan.
+    
+    Cada slot lleva una generación que aumenta al liberarlo, para que las
+    referencias NodoPool viejas no lean el nodo que reutilice el slot.
+    """
+
+    def __init__(self):
+        self.nombre = []
+        self.siguiente = array("i")
+        self.anterior = array("i")
+        self.ruta_cabeza = array("i")
+        self.generacion = array("i")
+        self.libres = array("i")  # Pila de slots libres
+        self.ruta_destino = []
+        self.ruta_siguiente = array("i")
+        self.ruta_libre = -1      # Primera celda libre, encadenada por `ruta_siguiente`
+
+    def vivos(self):
+        """**Método vivos**
+        
+        Devuelve la cantidad de slots ocupados.
+        """
+        return len(self.nombre) - len(self.libres)
+
+    def reservar(self, nombre):
+        """**Método reservar**
+        
+        Toma un slot libre (o crea uno) para un nuevo nodo y devuelve su índice.
+        """
+        if self.libres:
+            i = self.libres.pop()
+            self.nombre[i] = nombre
+            self.siguiente[i] = -1
+            self.anterior[i] = -1
+            self.ruta_cabeza[i] = -1
+            return i
+        self.nombre.append(nombre)
+        self.siguiente.append(-1)
+        self.anterior.append(-1)
+        self.ruta_cabeza.append(-1)
+        self.generacion.append(0)
+        return len(self.nombre) - 1
+
+    def liberar(self, i):
+        """**Método liberar**
+        
+        Devuelve un slot y sus celdas de rutas a las listas libres.
+        """
+        self._liberarCeldas(self.ruta_cabeza[i])
+        self.nombre[i] = None
+        self.ruta_cabeza[i] = -1
+        self.siguiente[i] = -2
+        self.anterior[i] = -2
+        self.generacion[i] += 1
+        self.libres.append(i)
+
+    def _liberarCeldas(self, celda):
+        while celda != -1:
+            siguiente = self.ruta_siguiente[celda]
+            self.ruta_destino[celda] = None
+            self.ruta_siguiente[celda] = self.ruta_libre
+            self.ruta_libre = celda
+            celda = siguiente
+
+    def agregarRuta(self, i, destino):
+        """**Método agregarRuta**
+        
+        Agrega una ruta al final de la cadena del slot ``i``.
+        """
+        if self.ruta_libre != -1:
+            celda = self.ruta_libre
+            self.ruta_libre = self.ruta_siguiente[celda]
+            self.ruta_destino[celda] = destino
+            self.ruta_siguiente[celda] = -1
+        else:
+            celda = len(self.ruta_destino)
+            self.ruta_destino.append(destino)
+            self.ruta_siguiente.append(-1)
+        actual = self.ruta_cabeza[i]
+        if actual == -1:
+            self.ruta_cabeza[i] = celda
+            return
+        while self.ruta_siguiente[actual] != -1:
+            actual = self.ruta_siguiente[actual]
+        self.ruta_siguiente[actual] = celda
+
+    def quitarRuta(self, i, destino):
+        """**Método quitarRuta**
+        
+        Quita la primera ruta del slot ``i`` hacia ``destino``.
+        
+        Returns:
+            bool: True si la ruta existía.
+        """
+        anterior, actual = -1, self.ruta_cabeza[i]
+        while actual != -1 and self.ruta_destino[actual] != destino:
+            anterior, actual = actual, self.ruta_siguiente[actual]
+        if actual == -1:
+            return False
+        if anterior == -1:
+            self.ruta_cabeza[i] = self.ruta_siguiente[actual]
+        else:
+            self.ruta_siguiente[anterior] = self.ruta_siguiente[actual]
+        self.ruta_destino[actual] = None
+        self.ruta_siguiente[actual] = self.ruta_libre
+        self.ruta_libre = actual
+        return True
+
+class RutasPool:
+    """**Clase RutasPool**
+    
+    Vista tipo lista sobre las rutas de un slot del pool. Lee siempre la
+    cadena actual del slot; asignarla a otro nodo (``b.rutas = a.rutas``)
+    copia los nombres, no comparte celdas.
+    """
+    __slots__ = ("pool", "i", "generacion")
+
+    def __init__(self, pool, i):
+        self.pool = pool
+        self.i = i
+        self.generacion = pool.generacion[i]
+
+    def _slot(self):
+        if self.pool.generacion[self.i] != self.generacion:
+            raise ReferenceError("El nodo ya fue eliminado de la lista")
+        return self.i
+
+    def __iter__(self):
+        pool = self.pool
+        celda = pool.ruta_cabeza[self._slot()]
+        while celda != -1:
+            yield pool.ruta_destino[celda]
+            celda = pool.ruta_siguiente[celda]
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, nombre):
+        return any(destino == nombre for destino in self)
+
+    def __eq__(self, otro):
+        return list(self) == list(otro)
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def append(self, nombre):
+        self.pool.agregarRuta(self._slot(), nombre)
+
+    def remove(self, nombre):
+        if not self.pool.quitarRuta(self._slot(), nombre):
+            raise ValueError(f"{nombre!r} no está en las rutas")
+
+class NodoPool:
+    """**Clase NodoPool**
+    
+    Referencia ligera a un slot de PoolUbicaciones con la misma interfaz que
+    NodoUbicacion (``nombre``, ``siguiente``, ``rutas`` y ``agregarRuta``).
+    
+    Recuerda la generación de su slot: usarla después de eliminar el nodo
+    lanza ReferenceError en lugar de leer el nodo que ocupe el slot después.
+    """
+    __slots__ = ("pool", "i", "generacion")
+
+    def __init__(self, pool, i):
+        self.pool = pool
+        self.i = i
+        self.generacion = pool.generacion[i]
+
+    def __eq__(self, otro):
+        return (isinstance(otro, NodoPool) and otro.pool is self.pool
+                and otro.i == self.i and otro.generacion == self.generacion)
+
+    def __hash__(self):
+        return hash((id(self.pool), self.i, self.generacion))
+
+    def _slot(self):
+        if self.pool.generacion[self.i] != self.generacion:
+            raise ReferenceError("El nodo ya fue eliminado de la lista")
+        return self.i
+
+    @property
+    def nombre(self):
+        return self.pool.nombre[self._slot()]
+
+    @nombre.setter
+    def nombre(self, valor):
+        self.pool.nombre[self._slot()] = valor
+
+    @property
+    def siguiente(self):
+        j = self.pool.siguiente[self._slot()]
+        return NodoPool(self.pool, j) if j != -1 else None
+
+    @siguiente.setter
+    def siguiente(self, nodo):
+        i = self._slot()
+        j = nodo.i if nodo is not None else -1
+        self.pool.siguiente[i] = j
+        if j != -1:
+            self.pool.anterior[j] = i
+
+    @property
+    def rutas(self):
+        return RutasPool(self.pool, self._slot())
+
+    @rutas.setter
+    def rutas(self, valor):
+        i = self._slot()
+        valor = list(valor)
+        self.pool._liberarCeldas(self.pool.ruta_cabeza[i])
+        self.pool.ruta_cabeza[i] = -1
+        for nombre in valor:
+            self.pool.agregarRuta(i, nombre)
+
+    def agregarRuta(self, nombreDestino):
+        """**Método agregarRuta**
+        
+        Agrega un destino a las rutas disponibles desde esta ubicación.
+        """
+        if nombreDestino not in self.rutas:
+            self.rutas.append(nombreDestino)
+
 class ListaUbicaciones:
     """**Clase ListaUbicaciones**
     
     Lista enlazada simple para administrar ubicaciones y sus rutas.
+    
+    Con ``compacta=True`` los nodos se guardan en un PoolUbicaciones y los
+    métodos trabajan sobre referencias NodoPool. Cada nodo del pool pertenece
+    a la lista, así que ``contar`` no recorre nada; ``buscar``, ``eliminar`` e
+    ``insertarAntes`` localizan el nombre con ``list.index`` (en C) y el nodo
+    anterior con el enlace ``anterior``; ``agregarFinal`` recuerda el último
+    slot. Ver ``benchmarkLista`` para memoria y tiempos de ambos modos.
     """
 
-    def __init__(self):
+    def __init__(self, compacta=False):
         self.cabeza = None  # Inicio de la lista enlazada
+        self._pool = PoolUbicaciones() if compacta else None
+        self._cola = -1     # Último slot conocido de la lista compacta
+
+    def _nuevoNodo(self, nombre):
+        """**Método _nuevoNodo**
+        
+        Crea un nodo en el almacenamiento que use la lista.
+        """
+        if self._pool is not None:
+            return NodoPool(self._pool, self._pool.reservar(nombre))
+        return NodoUbicacion(nombre)
+
+    def _liberarNodo(self, nodo):
+        """**Método _liberarNodo**
+        
+        Devuelve al pool el slot de un nodo ya desenlazado.
+        """
+        if self._pool is not None:
+            self._pool.liberar(nodo.i)
+
+    def _indices(self):
+        """**Método _indices**
+        
+        Recorre los slots de la lista compacta sin crear objetos intermedios.
+        """
+        siguiente = self._pool.siguiente
+        i = self.cabeza.i if self.cabeza else -1
+        while i != -1:
+            yield i
+            i = siguiente[i]
+
+    def _slot(self, nombre):
+        """**Método _slot**
+        
+        Devuelve el primer slot de la lista compacta con ese nombre, o -1.
+        Si el nombre es único basta con ``list.index``; si se repite, se
+        recorre la lista para respetar el orden.
+        """
+        nombres = self._pool.nombre
+        try:
+            i = nombres.index(nombre)
+        except ValueError:
+            return -1
+        try:
+            nombres.index(nombre, i + 1)
+        except ValueError:
+            return i
+        for i in self._indices():
+            if nombres[i] == nombre:
+                return i
+        return -1
+
+    def _ultimo(self):
+        """**Método _ultimo**
+        
+        Devuelve el último slot de la lista compacta (la única con siguiente -1).
+        """
+        siguiente = self._pool.siguiente
+        if self._cola == -1 or siguiente[self._cola] != -1:
+            self._cola = siguiente.index(-1)
+        return self._cola
 
     ## **MÉTODOS REQUERIDOS** ##
     
@@ -54,6 +365,9 @@ class ListaUbicaciones:
         Returns:
             int: Número de elementos en la lista.
         """
+        if self._pool is not None:
+            return self._pool.vivos()
+
         contador = 0
         actual = self.cabeza
         while actual:
@@ -70,6 +384,12 @@ class ListaUbicaciones:
             print("La lista está vacía")
             return
             
+        if self._pool is not None:
+            nombres = self._pool.nombre
+            for i in self._indices():
+                print(f"Ubicación: {nombres[i]}")
+            return
+            
         actual = self.cabeza
         while actual:
             print(f"Ubicación: {actual.nombre}")
@@ -83,6 +403,17 @@ class ListaUbicaciones:
         if self.estaVacia() or self.cabeza.siguiente is None:
             return  # Lista vacía o con un solo elemento ya está ordenada
             
+        if self._pool is not None:
+            # Mismo resultado que Bubble Sort (estable, mueve nombres y rutas,
+            # no nodos) con un ordenamiento O(n log n) sobre los arreglos
+            pool = self._pool
+            orden = list(self._indices())
+            valores = sorted(((pool.nombre[i], pool.ruta_cabeza[i]) for i in orden), key=lambda par: par[0])
+            for i, (nombre, cabeza) in zip(orden, valores):
+                pool.nombre[i] = nombre
+                pool.ruta_cabeza[i] = cabeza
+            return
+
         ordenado = False
         while not ordenado:
             ordenado = True
@@ -128,7 +459,7 @@ class ListaUbicaciones:
         
         Agrega una nueva ubicación al inicio de la lista.
         """
-        nuevo = NodoUbicacion(nombre)
+        nuevo = self._nuevoNodo(nombre)
         nuevo.siguiente = self.cabeza
         self.cabeza = nuevo
         return nuevo
@@ -138,7 +469,14 @@ class ListaUbicaciones:
         
         Agrega una nueva ubicación al final de la lista.
         """
-        nuevo = NodoUbicacion(nombre)
+        if self._pool is not None and self.cabeza:
+            ultimo = self._ultimo()  # Antes de reservar: el slot nuevo también tiene siguiente -1
+            nuevo = self._nuevoNodo(nombre)
+            self._pool.siguiente[ultimo] = nuevo.i
+            self._pool.anterior[nuevo.i] = ultimo
+            self._cola = nuevo.i
+            return nuevo
+        nuevo = self._nuevoNodo(nombre)
         if not self.cabeza:
             self.cabeza = nuevo
             return nuevo
@@ -155,11 +493,21 @@ class ListaUbicaciones:
         """
         if not self.cabeza or self.cabeza.nombre == referencia:
             return self.agregarInicio(nombre)
+        if self._pool is not None:
+            j = self._slot(referencia)
+            if j == -1:
+                return None
+            pool = self._pool
+            i = pool.anterior[j]
+            nuevo = self._nuevoNodo(nombre)
+            pool.siguiente[nuevo.i], pool.anterior[nuevo.i] = j, i
+            pool.siguiente[i], pool.anterior[j] = nuevo.i, nuevo.i
+            return nuevo
         actual = self.cabeza
         while actual.siguiente and actual.siguiente.nombre != referencia:
             actual = actual.siguiente
         if actual.siguiente:
-            nuevo = NodoUbicacion(nombre)
+            nuevo = self._nuevoNodo(nombre)
             nuevo.siguiente = actual.siguiente
             actual.siguiente = nuevo
             return nuevo
@@ -172,7 +520,7 @@ class ListaUbicaciones:
         """
         actual = self.buscar(referencia)
         if actual:
-            nuevo = NodoUbicacion(nombre)
+            nuevo = self._nuevoNodo(nombre)
             nuevo.siguiente = actual.siguiente
             actual.siguiente = nuevo
             return nuevo
@@ -185,6 +533,10 @@ class ListaUbicaciones:
         
         Busca una ubicación por su nombre y devuelve el nodo correspondiente.
         """
+        if self._pool is not None:
+            i = self._slot(nombre)
+            return NodoPool(self._pool, i) if i != -1 else None
+
         actual = self.cabeza
         while actual:
             if actual.nombre == nombre:
@@ -200,9 +552,24 @@ class ListaUbicaciones:
         if not self.cabeza:
             return False
             
+        if self._pool is not None and self.cabeza.nombre != nombre:
+            j = self._slot(nombre)
+            if j == -1:
+                return False
+            pool = self._pool
+            i, k = pool.anterior[j], pool.siguiente[j]
+            pool.siguiente[i] = k
+            if k != -1:
+                pool.anterior[k] = i
+            pool.liberar(j)
+            self._eliminarRutasHacia(nombre)
+            return True
+
         # Si el nodo a eliminar es la cabeza
         if self.cabeza.nombre == nombre:
+            eliminado = self.cabeza
             self.cabeza = self.cabeza.siguiente
+            self._liberarNodo(eliminado)
             # Actualizar rutas en todos los nodos que apuntan al eliminado
             self._eliminarRutasHacia(nombre)
             return True
@@ -214,7 +581,9 @@ class ListaUbicaciones:
             
         # Si se encontró el nodo
         if actual.siguiente:
-            actual.siguiente = actual.siguiente.siguiente
+            eliminado = actual.siguiente
+            actual.siguiente = eliminado.siguiente
+            self._liberarNodo(eliminado)
             # Actualizar rutas en todos los nodos que apuntan al eliminado
             self._eliminarRutasHacia(nombre)
             return True
@@ -226,6 +595,12 @@ class ListaUbicaciones:
         
         Elimina todas las rutas que apuntan hacia un nombre específico.
         """
+        if self._pool is not None:
+            if nombre in self._pool.ruta_destino:
+                for i in self._indices():
+                    self._pool.quitarRuta(i, nombre)
+            return
+
         actual = self.cabeza
         while actual:
             if nombre in actual.rutas:
@@ -310,6 +685,90 @@ class ListaUbicaciones:
         ruta_mas_corta = min(todas_rutas, key=len)
         return ruta_mas_corta
 
+    ## **MÉTODOS DE CONSULTAS EN LOTE** ##
+
+    def _arreglosCSR(self):
+        """**Método _arreglosCSR**
+        
+        Congela la lista en arreglos de enteros para recorrerla sin buscar nodos.
+        Si un nombre se repite vale el primer nodo (como en ``buscar``) y las
+        rutas hacia nombres que no están en la lista se ignoran.
+        
+        Returns:
+            tuple: (nombres, ids, desplazamientos, destinos); las rutas del id i son
+            destinos[desplazamientos[i]:desplazamientos[i + 1]].
+        """
+        nombres, ids, rutas = [], {}, []
+        if self._pool is not None:
+            pool = self._pool
+            for i in self._indices():
+                nombre = pool.nombre[i]
+                if nombre not in ids:
+                    ids[nombre] = len(nombres)
+                    nombres.append(nombre)
+                    rutas.append(RutasPool(pool, i))
+        else:
+            actual = self.cabeza
+            while actual:
+                if actual.nombre not in ids:
+                    ids[actual.nombre] = len(nombres)
+                    nombres.append(actual.nombre)
+                    rutas.append(actual.rutas)
+                actual = actual.siguiente
+
+        desplazamientos = array("q", [0])
+        destinos = array("i")
+        for rutas_nodo in rutas:
+            destinos.extend(ids[nombre] for nombre in rutas_nodo if nombre in ids)
+            desplazamientos.append(len(destinos))
+        return nombres, ids, desplazamientos, destinos
+
+    def buscarRutasLote(self, pares, procesos=1, conRutas=False):
+        """**Método buscarRutasLote**
+        
+        Resuelve muchos pares (origen, destino) con un solo BFS por origen distinto.
+        
+        Los pares se agrupan por origen y los grupos se reparten entre
+        ``procesos`` trabajadores (None = todos los núcleos). Los resultados se
+        entregan a medida que cada grupo termina, en cualquier orden.
+        
+        Args:
+            pares (iterable): Pares (origen, destino)
+            procesos (int): Número de procesos trabajadores (1 = en este proceso)
+            conRutas (bool): Si es True entrega la ruta completa en lugar de los saltos
+            
+        Yields:
+            tuple: (origen, destino, saltos o ruta), o None si no hay ruta o
+            alguna ubicación no existe.
+        """
+        nombres, ids, desplazamientos, destinos = self._arreglosCSR()
+        yield from consultasLote(pares, nombres, ids, desplazamientos, destinos, procesos, conRutas)
+
+    def masCercanos(self, sitios, consultas=None):
+        """**Método masCercanos**
+        
+        Responde "¿cuál de estos sitios tengo más cerca?" con un único BFS
+        multiorigen (sobre las rutas invertidas, desde todos los sitios a la vez).
+        
+        Args:
+            sitios (iterable): Nombres de los sitios candidatos
+            consultas (iterable): Ubicaciones a responder (None = todas)
+            
+        Yields:
+            tuple: (ubicación, sitio más cercano, saltos), o (ubicación, None, None)
+            si no alcanza ningún sitio.
+        """
+        nombres, ids, desplazamientos, destinos = self._arreglosCSR()
+        desplazamientos, destinos = transponer(desplazamientos, destinos)
+        origenes = [ids[sitio] for sitio in sitios if sitio in ids]
+        sitio, saltos = bfsMultiorigen(desplazamientos, destinos, origenes)
+        for nombre in (nombres if consultas is None else consultas):
+            i = ids.get(nombre)
+            if i is None or sitio[i] == -1:
+                yield nombre, None, None
+            else:
+                yield nombre, nombres[sitio[i]], saltos[i]
+
     ## **MÉTODO PARA MOSTRAR** ##
 
     def mostrar(self):
@@ -322,9 +781,111 @@ class ListaUbicaciones:
             print(f"{actual.nombre} → Rutas disponibles hacia: {actual.rutas}")
             actual = actual.siguiente
 
+# ========================= **BENCHMARKS** ========================= #
+
+def benchmarkLista(n=200_000, rutas_por_nodo=4, operaciones=10, n_orden=1_000):
+    """**Función benchmarkLista**
+    
+    Compara memoria y tiempos entre la lista de objetos y la lista compacta.
+    
+    Las dos listas usan los mismos objetos str para nombres y rutas, así que
+    la memoria medida es solo la de la estructura. ``agregarFinal`` e
+    ``insertarAntes`` se repiten ``operaciones`` veces sobre la lista completa y
+    ``bubbleSort`` se mide aparte sobre ``n_orden`` nodos desordenados.
+    """
+    nombres = [f"Ubicacion {i:07d}" for i in range(n + operaciones)]
+    desordenados = random.Random(0).sample(nombres[:n_orden], n_orden)
+    print(f"{'Almacenamiento':<16}{'bytes/nodo':>12}{'contar (ms)':>13}{'imprimir (ms)':>15}"
+          f"{'buscar (ms)':>13}{'agregarFinal (ms)':>19}{'insertarAntes (ms)':>20}{'bubbleSort (ms)':>17}")
+    for etiqueta, compacta in (("objetos", False), ("pool compacto", True)):
+        tracemalloc.start()
+        lista = ListaUbicaciones(compacta=compacta)
+        nodo = None
+        for i in range(n):
+            nodo = lista.agregarInicio(nombres[i])
+            for k in range(1, rutas_por_nodo + 1):
+                nodo.rutas.append(nombres[(i + k) % n])
+        memoria, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        inicio = time.perf_counter()
+        lista.contar()
+        t_contar = (time.perf_counter() - inicio) * 1000
+
+        inicio = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            lista.imprimir()
+        t_imprimir = (time.perf_counter() - inicio) * 1000
+
+        inicio = time.perf_counter()
+        lista.buscar("Ubicacion 0000000")  # Último nodo: recorre toda la lista
+        t_buscar = (time.perf_counter() - inicio) * 1000
+
+        inicio = time.perf_counter()
+        for nombre in nombres[n:]:
+            lista.agregarFinal(nombre)
+        t_final = (time.perf_counter() - inicio) * 1000
+
+        inicio = time.perf_counter()
+        for nombre in nombres[n:]:
+            lista.insertarAntes(nombres[0], nombre)  # nombres[0] es el último de la lista original
+        t_antes = (time.perf_counter() - inicio) * 1000
+
+        pequena = ListaUbicaciones(compacta=compacta)
+        for nombre in desordenados:
+            pequena.agregarFinal(nombre)
+        inicio = time.perf_counter()
+        pequena.bubbleSort()
+        t_orden = (time.perf_counter() - inicio) * 1000
+
+        print(f"{etiqueta:<16}{memoria / n:>12.1f}{t_contar:>13.2f}{t_imprimir:>15.2f}"
+              f"{t_buscar:>13.2f}{t_final:>19.2f}{t_antes:>20.2f}{t_orden:>17.2f}")
+
+def benchmarkLote(n=20_000, rutas_por_nodo=4, origenes=200, pares=20_000, sitios=10):
+    """**Función benchmarkLote**
+    
+    Compara un BFS por par contra las consultas agrupadas por origen (en uno
+    y en varios procesos) y mide el BFS multiorigen de ``masCercanos``.
+    """
+    rng = random.Random(0)
+    lista = ListaUbicaciones()
+    nombres = [f"Ubicacion {i:07d}" for i in range(n)]
+    for nombre in nombres:
+        nodo = lista.agregarInicio(nombre)
+        for _ in range(rutas_por_nodo):
+            nodo.rutas.append(rng.choice(nombres))
+    candidatos = rng.sample(nombres, origenes)
+    consultas = [(rng.choice(candidatos), rng.choice(nombres)) for _ in range(pares)]
+
+    # Un BFS por par se mide sobre una muestra y se extrapola al lote completo
+    _, ids, desplazamientos, destinos = lista._arreglosCSR()
+    muestra = consultas[:1000]
+    inicio = time.perf_counter()
+    for origen, destino in muestra:
+        resolverGrupos((False, [(ids[origen], [ids[destino]])]), (desplazamientos, destinos))
+    t_individual = (time.perf_counter() - inicio) * len(consultas) / len(muestra)
+    print(f"{'Un BFS por par (estimado)':<32}{t_individual:>8.2f} s")
+
+    for etiqueta, procesos in (("Agrupado, 1 proceso", 1), (f"Agrupado, {os.cpu_count()} procesos", None)):
+        inicio = time.perf_counter()
+        total = sum(1 for _ in lista.buscarRutasLote(consultas, procesos=procesos))
+        segundos = time.perf_counter() - inicio
+        print(f"{etiqueta:<32}{segundos:>8.2f} s  ({total} pares, x{t_individual / segundos:.0f})")
+
+    inicio = time.perf_counter()
+    sum(1 for _ in lista.masCercanos(rng.sample(nombres, sitios)))
+    print(f"{f'Más cercano de {sitios} sitios (todos)':<32}{time.perf_counter() - inicio:>8.2f} s")
+
+BENCHMARKS = {
+    "lista": benchmarkLista,
+    "lote": benchmarkLote,
+}
+
 # ========================= **PRUEBAS** ========================= #
 
-if __name__ == "__main__":
+if __name__ == "__main__" and len(sys.argv) > 2 and sys.argv[1] == "--benchmark":
+    BENCHMARKS[sys.argv[2]]()
+elif __name__ == "__main__":
     lista = ListaUbicaciones()
     
     # Verificar si la lista está vacía
@@ -5,6 +5,22 @@ Fecha: 28/04/2025
 """
 
 from collections import deque
+from array import array
+import os
+import random
+import struct
+import sys
+import tempfile
+import threading
+import time
+import zlib
+
+from consultas_lote import bfsMultiorigen, consultasLote
+
+# Mismo formato binario CSR que GrafoCSR en "Proyecto v3" (cabecera de 64 bytes)
+CSR_MAGIA = b"MTXCSR\x00\x00"
+CSR_VERSION = 1
+_CSR_CABECERA = struct.Struct("<8sIIQQI28x")
 
 class NodoUbicacionArbol:
     """**Clase NodoUbicacionArbol**
@@ -20,14 +36,39 @@ class NodoUbicacionArbol:
         self.altura = 1
         self.rutas = set()
 
+class NodoUbicacionCompacto:
+    """**Clase NodoUbicacionCompacto**
+
+    Variante de NodoUbicacionArbol con ``__slots__`` (sin ``__dict__``).
+    Cuando el árbol se compacta, sus rutas pasan a los arreglos CSR del árbol
+    y ``rutas`` queda en None.
+    """
+    __slots__ = ("nombre", "izquierda", "derecha", "altura", "rutas", "id")
+
+    def __init__(self, nombre: str):
+        self.nombre = nombre
+        self.izquierda = None
+        self.derecha = None
+        self.altura = 1
+        self.rutas = set()
+        self.id = -1
+
 class ArbolUbicaciones:
     """**Clase ArbolUbicaciones**
 
     Implementa un Árbol AVL para gestionar ubicaciones y sus rutas disponibles.
+    Con ``compacto=True`` usa nodos con ``__slots__``; ``compactar()`` congela
+    las rutas en arreglos CSR de enteros una vez terminada la construcción.
     """
 
-    def __init__(self):
+    def __init__(self, compacto: bool = False):
         self.raiz = None
+        self._clase_nodo = NodoUbicacionCompacto if compacto else NodoUbicacionArbol
+        # Representación CSR (solo tras compactar): las rutas del id i son
+        # _destinos[_desplazamientos[i]:_desplazamientos[i + 1]]
+        self._nombres = None
+        self._desplazamientos = None
+        self._destinos = None
 
     ## **MÉTODOS AUXILIARES** ##
 
@@ -63,12 +104,14 @@ class ArbolUbicaciones:
 
     def insertar(self, nombre: str):
         """Inserta una nueva ubicación en el árbol AVL."""
+        if self.estaCompactado():
+            self.descompactar()
         self.raiz = self._insertar_recursivo(self.raiz, nombre)
 
     def _insertar_recursivo(self, nodo, nombre):
         """Inserta recursivamente y balancea el árbol."""
         if not nodo:
-            return NodoUbicacionArbol(nombre)
+            return self._clase_nodo(nombre)
 
         if nombre < nodo.nombre:
             nodo.izquierda = self._insertar_recursivo(nodo.izquierda, nombre)
@@ -113,6 +156,8 @@ class ArbolUbicaciones:
         nodo_origen = self.buscar(origen)
         nodo_destino = self.buscar(destino)
         if nodo_origen and nodo_destino:
+            if self.estaCompactado():
+                self.descompactar()
             nodo_origen.rutas.add(destino)
             nodo_destino.rutas.add(origen)
             return True
@@ -124,6 +169,11 @@ class ArbolUbicaciones:
         if not nodo_origen:
             return f"Origen '{origen}' no encontrado"
 
+        if self.estaCompactado():
+            nodo_destino = self.buscar(destino)
+            ruta = self._dfsIds(nodo_origen.id, nodo_destino.id) if nodo_destino else None
+            return ruta if ruta else f"No hay ruta de '{origen}' a '{destino}'"
+
         ruta = []
         visitados = set()
 
@@ -153,6 +203,11 @@ class ArbolUbicaciones:
         if not nodo_origen:
             return f"Origen '{origen}' no encontrado"
 
+        if self.estaCompactado():
+            nodo_destino = self.buscar(destino)
+            ruta = self._bfsIds(nodo_origen.id, nodo_destino.id) if nodo_destino else None
+            return ruta if ruta else f"No hay ruta de '{origen}' a '{destino}'"
+
         cola = deque()
         visitados = set()
         cola.append((origen, [origen]))
@@ -172,6 +227,49 @@ class ArbolUbicaciones:
                     cola.append((vecino, ruta + [vecino]))
 
         return f"No hay ruta de '{origen}' a '{destino}'"
+
+    def _bfsIds(self, origen: int, destino: int):
+        """BFS sobre ids enteros y arreglos CSR; devuelve la ruta en nombres o None."""
+        desplazamientos, destinos = self._desplazamientos, self._destinos
+        padres = array("i", [-1]) * len(self._nombres)
+        padres[origen] = origen
+        cola = deque([origen])
+        while cola:
+            actual = cola.popleft()
+            if actual == destino:
+                return self._reconstruirRuta(padres, origen, destino)
+            for k in range(desplazamientos[actual], desplazamientos[actual + 1]):
+                vecino = destinos[k]
+                if padres[vecino] == -1:
+                    padres[vecino] = actual
+                    cola.append(vecino)
+        return None
+
+    def _dfsIds(self, origen: int, destino: int):
+        """DFS iterativo sobre ids enteros y arreglos CSR; devuelve la ruta en nombres o None."""
+        desplazamientos, destinos = self._desplazamientos, self._destinos
+        padres = array("i", [-1]) * len(self._nombres)
+        padres[origen] = origen
+        pila = [(origen, desplazamientos[origen])]
+        while pila:
+            actual, k = pila[-1]
+            if actual == destino:
+                return self._reconstruirRuta(padres, origen, destino)
+            if k == desplazamientos[actual + 1]:
+                pila.pop()
+                continue
+            pila[-1] = (actual, k + 1)
+            vecino = destinos[k]
+            if padres[vecino] == -1:
+                padres[vecino] = actual
+                pila.append((vecino, desplazamientos[vecino]))
+        return None
+
+    def _reconstruirRuta(self, padres, origen: int, destino: int):
+        ruta = [destino]
+        while ruta[-1] != origen:
+            ruta.append(padres[ruta[-1]])
+        return [self._nombres[i] for i in reversed(ruta)]
     
 #========================= **IMPLEMENTACIÓN ADICIONAL** ========================= #
     def sugerirRutaMasCercana(self, origen: str):
@@ -179,8 +277,9 @@ class ArbolUbicaciones:
         nodo_origen = self.buscar(origen)
         if not nodo_origen:
             return f"Origen '{origen}' no encontrado"
-        if nodo_origen.rutas:
-            return min(nodo_origen.rutas)
+        rutas = self._rutas(nodo_origen)
+        if rutas:
+            return min(rutas)
         return "No hay rutas disponibles para sugerir"
 
     ## **MÉTODO DE RECORRIDO** ##
@@ -189,13 +288,538 @@ class ArbolUbicaciones:
         def in_order(nodo):
             if nodo:
                 in_order(nodo.izquierda)
-                print(f"{nodo.nombre} → {list(nodo.rutas)}")
+                print(f"{nodo.nombre} → {list(self._rutas(nodo))}")
                 in_order(nodo.derecha)
         in_order(self.raiz)
 
+    ## **MÉTODOS DE REPRESENTACIÓN COMPACTA** ##
+    def _nodosEnOrden(self):
+        """Devuelve los nodos del árbol en orden alfabético (sin recursión)."""
+        nodos = []
+        pila = []
+        actual = self.raiz
+        while pila or actual:
+            while actual:
+                pila.append(actual)
+                actual = actual.izquierda
+            actual = pila.pop()
+            nodos.append(actual)
+            actual = actual.derecha
+        return nodos
+
+    def nombresEnOrden(self):
+        """Devuelve los nombres del árbol en orden alfabético."""
+        if self.estaCompactado():
+            return list(self._nombres)
+        return [nodo.nombre for nodo in self._nodosEnOrden()]
+
+    def _rutas(self, nodo):
+        """Devuelve los nombres alcanzables desde un nodo en cualquiera de las dos representaciones."""
+        if nodo.rutas is not None:
+            return nodo.rutas
+        inicio, fin = self._desplazamientos[nodo.id], self._desplazamientos[nodo.id + 1]
+        return [self._nombres[j] for j in self._destinos[inicio:fin]]
+
+    def estaCompactado(self):
+        """Indica si las rutas están congeladas en arreglos CSR."""
+        return self._destinos is not None
+
+    def compactar(self):
+        """Congela las rutas en arreglos CSR de enteros.
+
+        Asigna a cada nodo un id según el orden alfabético, guarda la tabla
+        id → nombre y libera los ``set`` de cada nodo. La traducción nombre → id
+        la resuelve el propio árbol con ``buscar``. Insertar o crear rutas
+        después descompacta el árbol automáticamente.
+        """
+        if self.estaCompactado():
+            return
+        nodos = self._nodosEnOrden()
+        for i, nodo in enumerate(nodos):
+            nodo.id = i
+        desplazamientos = array("q", [0])
+        destinos = array("i")
+        for nodo in nodos:
+            destinos.extend(sorted(self.buscar(vecino).id for vecino in nodo.rutas))
+            desplazamientos.append(len(destinos))
+        for nodo in nodos:
+            nodo.rutas = None
+        self._nombres = [nodo.nombre for nodo in nodos]
+        self._desplazamientos = desplazamientos
+        self._destinos = destinos
+
+    def descompactar(self):
+        """Reconstruye los ``set`` de rutas de cada nodo a partir de los arreglos CSR."""
+        if not self.estaCompactado():
+            return
+        for nodo in self._nodosEnOrden():
+            nodo.rutas = set(self._rutas(nodo))
+        self._nombres = None
+        self._desplazamientos = None
+        self._destinos = None
+
+    def memoriaEstimada(self):
+        """Estima los bytes usados por nodos y rutas (sin contar las cadenas de nombres).
+
+        Returns:
+            dict: ubicaciones, rutas almacenadas, bytes de nodos y bytes de rutas.
+        """
+        nodos = self._nodosEnOrden()
+        bytes_nodos = 0
+        for nodo in nodos:
+            bytes_nodos += sys.getsizeof(nodo)
+            if hasattr(nodo, "__dict__"):
+                bytes_nodos += sys.getsizeof(nodo.__dict__)
+        if self.estaCompactado():
+            n_rutas = len(self._destinos)
+            bytes_rutas = (sys.getsizeof(self._nombres) + sys.getsizeof(self._desplazamientos)
+                           + sys.getsizeof(self._destinos))
+        else:
+            n_rutas = sum(len(nodo.rutas) for nodo in nodos)
+            bytes_rutas = sum(sys.getsizeof(nodo.rutas) for nodo in nodos)
+        return {"ubicaciones": len(nodos), "rutas": n_rutas,
+                "bytes_nodos": bytes_nodos, "bytes_rutas": bytes_rutas}
+
+    ## **MÉTODOS DE CONSULTAS EN LOTE** ##
+
+    def buscarRutasLote(self, pares, procesos: int = 1, conRutas: bool = False):
+        """Resuelve muchos pares (origen, destino) con un solo BFS por origen distinto.
+
+        Los pares se agrupan por origen y los grupos se reparten entre
+        ``procesos`` trabajadores (None = todos los núcleos). Es un generador:
+        entrega (origen, destino, saltos o ruta) a medida que cada grupo
+        termina, con None si no hay ruta o alguna ubicación no existe.
+        """
+        nombres, desplazamientos, destinos = self._arreglosCSR()
+        ids = {nombre: i for i, nombre in enumerate(nombres)}
+        yield from consultasLote(pares, nombres, ids, desplazamientos, destinos, procesos, conRutas)
+
+    def masCercanos(self, sitios, consultas=None):
+        """Para cada ubicación (o solo ``consultas``) da el sitio más cercano en saltos.
+
+        Un único BFS multiorigen desde todos los sitios a la vez; entrega
+        (ubicación, sitio, saltos) o (ubicación, None, None) si no alcanza ninguno.
+        """
+        nombres, desplazamientos, destinos = self._arreglosCSR()
+        ids = {nombre: i for i, nombre in enumerate(nombres)}
+        sitio, saltos = bfsMultiorigen(desplazamientos, destinos, [ids[s] for s in sitios if s in ids])
+        for nombre in (nombres if consultas is None else consultas):
+            i = ids.get(nombre)
+            if i is None or sitio[i] == -1:
+                yield nombre, None, None
+            else:
+                yield nombre, nombres[sitio[i]], saltos[i]
+
+    ## **MÉTODOS DE EXPORTACIÓN** ##
+
+    def _arreglosCSR(self):
+        """Devuelve copias de (nombres, desplazamientos, destinos) sin modificar el árbol.
+
+        Si no está compactado arma los arreglos con un recorrido en orden de solo lectura.
+        """
+        if self.estaCompactado():
+            return list(self._nombres), array("q", self._desplazamientos), array("i", self._destinos)
+        nodos = self._nodosEnOrden()
+        nombres = [nodo.nombre for nodo in nodos]
+        ids = {nombre: i for i, nombre in enumerate(nombres)}
+        desplazamientos = array("q", [0])
+        destinos = array("i")
+        for nodo in nodos:
+            destinos.extend(sorted(ids[vecino] for vecino in nodo.rutas))
+            desplazamientos.append(len(destinos))
+        return nombres, desplazamientos, destinos
+
+    def exportarCSR(self, ruta: str):
+        """Guarda las ubicaciones y rutas en el formato binario CSR.
+
+        Cada ruta se guarda con peso 1.0 (un salto) y las coordenadas como NaN,
+        ya que el árbol no maneja distancias ni posiciones.
+        """
+        nombres, desplazamientos, destinos = self._arreglosCSR()
+
+        desp_nombres = array("q", [0])
+        blob = bytearray()
+        for nombre in nombres:
+            blob += nombre.encode("utf-8")
+            desp_nombres.append(len(blob))
+        pesos = array("d", [1.0]) * len(destinos)
+        coordenadas = array("d", [float("nan")]) * (2 * len(nombres))
+
+        secciones = [desp_nombres, blob, desplazamientos, destinos, pesos, coordenadas]
+        if sys.byteorder != "little":
+            for seccion in secciones:
+                if isinstance(seccion, array):
+                    seccion.byteswap()
+        secciones = [bytes(seccion) for seccion in secciones]
+        secciones = [seccion + b"\x00" * (-len(seccion) % 8) for seccion in secciones]
+
+        crc = 0
+        for seccion in secciones:
+            crc = zlib.crc32(seccion, crc)
+        with open(ruta, "wb") as archivo:
+            archivo.write(_CSR_CABECERA.pack(CSR_MAGIA, CSR_VERSION, len(nombres),
+                                             len(destinos), len(blob), crc))
+            for seccion in secciones:
+                archivo.write(seccion)
+
+    @staticmethod
+    def cargarCSR(ruta: str):
+        """Crea un árbol compactado a partir de un archivo CSR (de ``exportarCSR`` o de "Proyecto v3").
+
+        Los nombres vienen ordenados en el archivo, así que el árbol se arma
+        balanceado de una vez y las rutas pasan directo a los arreglos CSR.
+        Pesos y coordenadas se ignoran.
+        """
+        with open(ruta, "rb") as archivo:
+            datos = archivo.read()
+        if len(datos) < _CSR_CABECERA.size:
+            raise ValueError(f"'{ruta}' no es un archivo CSR válido")
+        magia, version, n, m, bytes_nombres, crc = _CSR_CABECERA.unpack_from(datos)
+        if magia != CSR_MAGIA:
+            raise ValueError(f"'{ruta}' no es un archivo CSR válido")
+        if version != CSR_VERSION:
+            raise ValueError(f"Versión CSR {version} no soportada (se esperaba {CSR_VERSION})")
+        tamanos = [8 * (n + 1), bytes_nombres, 8 * (n + 1), 4 * m, 8 * m, 16 * n]
+        if len(datos) != _CSR_CABECERA.size + sum(tam + (-tam % 8) for tam in tamanos):
+            raise ValueError(f"'{ruta}' está truncado o tiene un tamaño inesperado")
+        if zlib.crc32(memoryview(datos)[_CSR_CABECERA.size:]) != crc:
+            raise ValueError(f"Checksum inválido en '{ruta}'")
+
+        secciones, inicio = [], _CSR_CABECERA.size
+        for tam in tamanos[:4]:
+            secciones.append(datos[inicio:inicio + tam])
+            inicio += tam + (-tam % 8)
+        desp_nombres, blob = array("q", secciones[0]), secciones[1]
+        desplazamientos, destinos = array("q", secciones[2]), array("i", secciones[3])
+        if sys.byteorder != "little":
+            for seccion in (desp_nombres, desplazamientos, destinos):
+                seccion.byteswap()
+        nombres = [blob[desp_nombres[i]:desp_nombres[i + 1]].decode("utf-8") for i in range(n)]
+        if any(a >= b for a, b in zip(nombres, nombres[1:])):
+            raise ValueError(f"'{ruta}' tiene nombres repetidos o desordenados")
+        if desplazamientos[0] != 0 or desplazamientos[-1] != m or (m and not 0 <= min(destinos) <= max(destinos) < n):
+            raise ValueError(f"'{ruta}' tiene rutas fuera de rango")
+
+        arbol = ArbolUbicaciones(compacto=True)
+        nodos = [NodoUbicacionCompacto(nombre) for nombre in nombres]
+        for i, nodo in enumerate(nodos):
+            nodo.id = i
+            nodo.rutas = None
+        arbol.raiz = arbol._construirBalanceado(nodos, 0, n)
+        arbol._nombres = nombres
+        arbol._desplazamientos = desplazamientos
+        arbol._destinos = destinos
+        return arbol
+
+    def _construirBalanceado(self, nodos, inicio: int, fin: int):
+        """Enlaza nodos[inicio:fin] (ya ordenados) como un subárbol AVL balanceado."""
+        if inicio >= fin:
+            return None
+        medio = (inicio + fin) // 2
+        nodo = nodos[medio]
+        nodo.izquierda = self._construirBalanceado(nodos, inicio, medio)
+        nodo.derecha = self._construirBalanceado(nodos, medio + 1, fin)
+        nodo.altura = 1 + max(self._altura(nodo.izquierda), self._altura(nodo.derecha))
+        return nodo
+
+# ========================= **ÁRBOL PERSISTENTE** ========================= #
+
+class NodoUbicacionPersistente:
+    """**Clase NodoUbicacionPersistente**
+
+    Nodo inmutable del árbol persistente: nunca se modifica después de
+    crearlo, así que puede estar compartido por varias versiones del árbol.
+    Las rutas se guardan en un ``frozenset``.
+    """
+    __slots__ = ("nombre", "izquierda", "derecha", "altura", "rutas")
+
+    def __init__(self, nombre: str, izquierda=None, derecha=None, rutas=frozenset()):
+        self.nombre = nombre
+        self.izquierda = izquierda
+        self.derecha = derecha
+        self.altura = 1 + max(izquierda.altura if izquierda else 0, derecha.altura if derecha else 0)
+        self.rutas = rutas
+
+class ArbolUbicacionesPersistente(ArbolUbicaciones):
+    """**Clase ArbolUbicacionesPersistente**
+
+    Árbol AVL persistente por copia de camino: insertar, eliminar o crear
+    rutas copia solo los O(log n) nodos entre la raíz y los nodos afectados y
+    publica la nueva raíz con una sola asignación. Los lectores no toman
+    ningún candado; cada consulta trabaja sobre la raíz vigente al empezar y
+    nunca ve una rotación a medias. Los escritores se serializan entre sí con
+    un candado.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._clase_nodo = NodoUbicacionPersistente
+        self._escritura = threading.Lock()
+
+    def instantanea(self):
+        """Devuelve en O(1) una copia independiente de la versión actual.
+
+        Escribir en la copia crea una rama nueva sin afectar a este árbol.
+        """
+        copia = ArbolUbicacionesPersistente()
+        copia.raiz = self.raiz
+        return copia
+
+    ## **COPIA DE CAMINO** ##
+
+    def _balancear(self, nombre, izquierda, derecha, rutas):
+        """Crea el nodo (nombre, izquierda, derecha) aplicando las rotaciones AVL sobre copias."""
+        balance = self._altura(izquierda) - self._altura(derecha)
+        if balance > 1:
+            if self._balance_factor(izquierda) < 0:
+                izquierda = self._rotar_izquierda(izquierda)
+            return self._rotar_derecha(NodoUbicacionPersistente(nombre, izquierda, derecha, rutas))
+        if balance < -1:
+            if self._balance_factor(derecha) > 0:
+                derecha = self._rotar_derecha(derecha)
+            return self._rotar_izquierda(NodoUbicacionPersistente(nombre, izquierda, derecha, rutas))
+        return NodoUbicacionPersistente(nombre, izquierda, derecha, rutas)
+
+    def _rotar_derecha(self, y):
+        """Rotación a la derecha que crea nodos nuevos en lugar de modificar ``y``."""
+        x = y.izquierda
+        nuevo_y = NodoUbicacionPersistente(y.nombre, x.derecha, y.derecha, y.rutas)
+        return NodoUbicacionPersistente(x.nombre, x.izquierda, nuevo_y, x.rutas)
+
+    def _rotar_izquierda(self, x):
+        """Rotación a la izquierda que crea nodos nuevos en lugar de modificar ``x``."""
+        y = x.derecha
+        nuevo_x = NodoUbicacionPersistente(x.nombre, x.izquierda, y.izquierda, x.rutas)
+        return NodoUbicacionPersistente(y.nombre, nuevo_x, y.derecha, y.rutas)
+
+    def _insertar_recursivo(self, nodo, nombre):
+        if not nodo:
+            return NodoUbicacionPersistente(nombre)
+        if nombre < nodo.nombre:
+            return self._balancear(nodo.nombre, self._insertar_recursivo(nodo.izquierda, nombre),
+                                   nodo.derecha, nodo.rutas)
+        if nombre > nodo.nombre:
+            return self._balancear(nodo.nombre, nodo.izquierda,
+                                   self._insertar_recursivo(nodo.derecha, nombre), nodo.rutas)
+        return nodo  # No permite duplicados
+
+    def _eliminar_recursivo(self, nodo, nombre):
+        if not nodo:
+            return None
+        if nombre < nodo.nombre:
+            return self._balancear(nodo.nombre, self._eliminar_recursivo(nodo.izquierda, nombre),
+                                   nodo.derecha, nodo.rutas)
+        if nombre > nodo.nombre:
+            return self._balancear(nodo.nombre, nodo.izquierda,
+                                   self._eliminar_recursivo(nodo.derecha, nombre), nodo.rutas)
+        if not nodo.izquierda or not nodo.derecha:
+            return nodo.izquierda or nodo.derecha
+        sucesor = nodo.derecha
+        while sucesor.izquierda:
+            sucesor = sucesor.izquierda
+        return self._balancear(sucesor.nombre, nodo.izquierda,
+                               self._eliminar_recursivo(nodo.derecha, sucesor.nombre), sucesor.rutas)
+
+    def _reemplazarRutas(self, nodo, nombre, rutas):
+        """Copia el camino hasta ``nombre`` con sus rutas cambiadas (la forma del árbol no cambia)."""
+        if nombre < nodo.nombre:
+            return NodoUbicacionPersistente(nodo.nombre, self._reemplazarRutas(nodo.izquierda, nombre, rutas),
+                                            nodo.derecha, nodo.rutas)
+        if nombre > nodo.nombre:
+            return NodoUbicacionPersistente(nodo.nombre, nodo.izquierda,
+                                            self._reemplazarRutas(nodo.derecha, nombre, rutas), nodo.rutas)
+        return NodoUbicacionPersistente(nodo.nombre, nodo.izquierda, nodo.derecha, rutas)
+
+    ## **ESCRITURA** ##
+
+    def insertar(self, nombre: str):
+        """Inserta una ubicación y publica la nueva versión."""
+        with self._escritura:
+            self.raiz = self._insertar_recursivo(self.raiz, nombre)
+
+    def eliminar(self, nombre: str):
+        """Elimina una ubicación y las rutas que llegan a ella; devuelve False si no existía."""
+        with self._escritura:
+            raiz = self.raiz
+            nodo = self._buscarEn(raiz, nombre)
+            if not nodo:
+                return False
+            for vecino in nodo.rutas:
+                if vecino != nombre:
+                    rutas_vecino = self._buscarEn(raiz, vecino).rutas
+                    raiz = self._reemplazarRutas(raiz, vecino, rutas_vecino - {nombre})
+            self.raiz = self._eliminar_recursivo(raiz, nombre)
+            return True
+
+    def establecerRuta(self, origen: str, destino: str):
+        """Establece una conexión bidireccional; los lectores ven ambas direcciones o ninguna."""
+        with self._escritura:
+            raiz = self.raiz
+            nodo_origen = self._buscarEn(raiz, origen)
+            nodo_destino = self._buscarEn(raiz, destino)
+            if not (nodo_origen and nodo_destino):
+                return False
+            raiz = self._reemplazarRutas(raiz, origen, nodo_origen.rutas | {destino})
+            raiz = self._reemplazarRutas(raiz, destino, self._buscarEn(raiz, destino).rutas | {origen})
+            self.raiz = raiz
+            return True
+
+    ## **LECTURA** ##
+
+    def _buscarEn(self, raiz, nombre: str):
+        actual = raiz
+        while actual:
+            if nombre == actual.nombre:
+                return actual
+            actual = actual.izquierda if nombre < actual.nombre else actual.derecha
+        return None
+
+    def buscarRutaDFS(self, origen: str, destino: str):
+        """Como en ArbolUbicaciones, sobre la versión vigente al empezar la búsqueda."""
+        return ArbolUbicaciones.buscarRutaDFS(self.instantanea(), origen, destino)
+
+    def buscarRutaBFS(self, origen: str, destino: str):
+        """Como en ArbolUbicaciones, sobre la versión vigente al empezar la búsqueda."""
+        return ArbolUbicaciones.buscarRutaBFS(self.instantanea(), origen, destino)
+
+    def compactar(self):
+        raise TypeError("Los nodos de un árbol persistente son inmutables; no se puede compactar")
+
+    def _arreglosCSR(self):
+        return ArbolUbicaciones._arreglosCSR(self.instantanea())
+
+# ========================= **BENCHMARKS** ========================= #
+
+def _arbolAleatorio(n_nodos: int, grado: int, compacto: bool, semilla: int = 0):
+    """Construye un árbol con ``n_nodos`` ubicaciones y ~``grado`` rutas por ubicación."""
+    rng = random.Random(semilla)
+    nombres = [f"Ubicacion {i:07d}" for i in range(n_nodos)]
+    arbol = ArbolUbicaciones(compacto=compacto)
+    for nombre in nombres:
+        arbol.insertar(nombre)
+    for _ in range(n_nodos * grado // 2):
+        arbol.establecerRuta(rng.choice(nombres), rng.choice(nombres))
+    return arbol, nombres
+
+def reporteMemoria(n_nodos: int = 100_000, grado: int = 8):
+    """Compara memoria y tiempo de BFS entre la representación con ``set`` y la compacta."""
+    print(f"{'Representación':<22}{'bytes/nodo':>12}{'bytes/ruta':>12}{'BFS (ms)':>10}")
+    for etiqueta, compacto in (("set + __dict__", False), ("__slots__ + CSR", True)):
+        arbol, nombres = _arbolAleatorio(n_nodos, grado, compacto)
+        if compacto:
+            arbol.compactar()
+        memoria = arbol.memoriaEstimada()
+        rng = random.Random(1)
+        inicio = time.perf_counter()
+        for _ in range(20):
+            arbol.buscarRutaBFS(rng.choice(nombres), rng.choice(nombres))
+        ms = (time.perf_counter() - inicio) * 1000 / 20
+        total = memoria["bytes_nodos"] + memoria["bytes_rutas"]
+        print(f"{etiqueta:<22}{total / memoria['ubicaciones']:>12.1f}"
+              f"{memoria['bytes_rutas'] / max(memoria['rutas'], 1):>12.1f}{ms:>10.2f}")
+
+def _medirConcurrencia(arbol, nombres, lectores: int, con_escritor: bool, segundos: float, candado=None):
+    """Ejecuta ``lectores`` hilos de búsqueda (y opcionalmente un escritor) durante ``segundos``.
+
+    Returns:
+        tuple: (lecturas por segundo, escrituras por segundo).
+    """
+    detener = threading.Event()
+    conteos = [0] * (lectores + 1)
+
+    def lector(k):
+        rng = random.Random(k)
+        total = 0
+        while not detener.is_set():
+            for _ in range(100):
+                nombre = rng.choice(nombres)
+                if candado:
+                    with candado:
+                        arbol.buscar(nombre)
+                else:
+                    arbol.buscar(nombre)
+            total += 100
+        conteos[k] = total
+
+    def escritor():
+        rng = random.Random(-1)
+        total = 0
+        while not detener.is_set():
+            nuevo = f"Nueva {total:07d}"
+            if candado:
+                with candado:
+                    arbol.insertar(nuevo)
+                    arbol.establecerRuta(nuevo, rng.choice(nombres))
+            else:
+                arbol.insertar(nuevo)
+                arbol.establecerRuta(nuevo, rng.choice(nombres))
+            total += 1
+        conteos[lectores] = total
+
+    hilos = [threading.Thread(target=lector, args=(k,)) for k in range(lectores)]
+    if con_escritor:
+        hilos.append(threading.Thread(target=escritor))
+    for hilo in hilos:
+        hilo.start()
+    time.sleep(segundos)
+    detener.set()
+    for hilo in hilos:
+        hilo.join()
+    return sum(conteos[:lectores]) / segundos, conteos[lectores] / segundos
+
+def benchmarkConcurrencia(n_nodos: int = 50_000, segundos: float = 1.0):
+    """Compara lecturas por segundo con un candado global contra el árbol persistente sin candado."""
+    nombres = [f"Ubicacion {i:07d}" for i in range(n_nodos)]
+    print(f"{'Variante':<16}{'lectores':>9}{'lect/s':>12}{'lect/s + escritor':>19}{'escr/s':>10}")
+    for etiqueta, persistente in (("candado global", False), ("persistente", True)):
+        for lectores in (1, 2, 4, 8):
+            resultados = []
+            for con_escritor in (False, True):
+                arbol = ArbolUbicacionesPersistente() if persistente else ArbolUbicaciones()
+                for nombre in nombres:
+                    arbol.insertar(nombre)
+                candado = None if persistente else threading.Lock()
+                resultados.append(_medirConcurrencia(arbol, nombres, lectores, con_escritor, segundos, candado))
+            (lecturas, _), (lecturas_escritor, escrituras) = resultados
+            print(f"{etiqueta:<16}{lectores:>9}{lecturas:>12,.0f}{lecturas_escritor:>19,.0f}{escrituras:>10,.0f}")
+
+def benchmarkLote(n_nodos: int = 50_000, grado: int = 8, origenes: int = 200, pares: int = 20_000):
+    """Compara buscarRutaBFS par por par contra buscarRutasLote (agrupado por origen) y masCercanos."""
+    arbol, nombres = _arbolAleatorio(n_nodos, grado, compacto=True)
+    arbol.compactar()
+    rng = random.Random(1)
+    candidatos = rng.sample(nombres, origenes)
+    consultas = [(rng.choice(candidatos), rng.choice(nombres)) for _ in range(pares)]
+
+    # buscarRutaBFS par por par se mide sobre una muestra y se extrapola
+    muestra = consultas[:200]
+    inicio = time.perf_counter()
+    for origen, destino in muestra:
+        arbol.buscarRutaBFS(origen, destino)
+    t_individual = (time.perf_counter() - inicio) * len(consultas) / len(muestra)
+    print(f"{'buscarRutaBFS por par (estimado)':<36}{t_individual:>8.2f} s")
+
+    for etiqueta, procesos in (("Lote, 1 proceso", 1), (f"Lote, {os.cpu_count()} procesos", None)):
+        inicio = time.perf_counter()
+        total = sum(1 for _ in arbol.buscarRutasLote(consultas, procesos=procesos, conRutas=True))
+        segundos = time.perf_counter() - inicio
+        print(f"{etiqueta:<36}{segundos:>8.2f} s  ({total} pares, x{t_individual / segundos:.0f})")
+
+    inicio = time.perf_counter()
+    sum(1 for _ in arbol.masCercanos(rng.sample(nombres, 10)))
+    print(f"{'Más cercano de 10 sitios (todos)':<36}{time.perf_counter() - inicio:>8.2f} s")
+
+BENCHMARKS = {
+    "memoria": reporteMemoria,
+    "concurrencia": benchmarkConcurrencia,
+    "lote": benchmarkLote,
+}
+
 # ========================= **PRUEBAS** ========================= #
 
-if __name__ == "__main__":
+if __name__ == "__main__" and len(sys.argv) > 2 and sys.argv[1] == "--benchmark":
+    BENCHMARKS[sys.argv[2]]()
+elif __name__ == "__main__":
     arbol = ArbolUbicaciones()
 
     for nombre in ["M", "C", "R", "A", "E", "P", "T"]:
@@ -215,3 +839,10 @@ if __name__ == "__main__":
     print("Búsqueda de ruta BFS de 'M' a 'T':", arbol.buscarRutaBFS("M", "T"))
 
     print("\nSugerencia de ruta más cercana desde 'M':", arbol.sugerirRutaMasCercana("M"))
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta_csr = os.path.join(carpeta, "arbol.csr")
+        arbol.exportarCSR(ruta_csr)
+        cargado = ArbolUbicaciones.cargarCSR(ruta_csr)
+    print("\nIda y vuelta CSR: mismas ubicaciones:", cargado.nombresEnOrden() == arbol.nombresEnOrden(),
+          "| BFS de 'M' a 'T':", cargado.buscarRutaBFS("M", "T"))
@@ -1,27 +1,392 @@
 """Plataforma de Monterrey Tours Express - Versión con Red Densa"""
+import asyncio
+import heapq
+import json
+import os
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, font as tkfont
 import networkx as nx
 import matplotlib.pyplot as plt
-from collections import defaultdict
+from collections import ChainMap, defaultdict, deque
+from collections.abc import MutableMapping
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, repeat
+from http import HTTPStatus
+import math
 import numpy as np
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
+import unicodedata
+import zlib
+from array import array
+from types import MappingProxyType
+
+# Formato binario CSR: cabecera de 64 bytes y secciones alineadas a 8 bytes
+CSR_MAGIA = b"MTXCSR\x00\x00"
+CSR_VERSION = 1
+_CSR_CABECERA = struct.Struct("<8sIIQQI28x")  # magia, versión, nodos, aristas, bytes de nombres, crc32
+
+# Red predefinida de conexiones (compartida por la interfaz y el servicio de rutas)
+DISTANCIAS_PREDEFINIDAS = {
+    # Conexiones con Macroplaza (distancias reales aproximadas)
+    ("Macroplaza", "Parque Fundidora"): 1.8,
+    ("Macroplaza", "Museo del Acero"): 2.1,
+    ("Macroplaza", "Barrio Antiguo"): 0.8,
+    ("Macroplaza", "Catedral de Monterrey"): 0.3,
+    ("Macroplaza", "Cerro del Obispado"): 3.2,
+    ("Macroplaza", "Estadio BBVA"): 6.8,
+    ("Macroplaza", "Paseo Santa Lucía"): 0.5,
+    ("Macroplaza", "Museo de Historia Mexicana"): 0.4,
+    
+    # Conexiones entre ubicaciones (distancias reales aproximadas)
+    ("Parque Fundidora", "Museo del Acero"): 1.2,
+    ("Parque Fundidora", "Paseo Santa Lucía"): 2.5,  
+    ("Parque Fundidora", "Estadio BBVA"): 8.0,
+    ("Museo del Acero", "Estadio BBVA"): 7.2,
+    ("Museo del Acero", "Cerro del Obispado"): 4.1,
+    ("Barrio Antiguo", "Cerro del Obispado"): 2.9,
+    ("Barrio Antiguo", "Museo de Historia Mexicana"): 1.2,
+    ("Catedral de Monterrey", "Museo de Historia Mexicana"): 0.6,
+    ("Catedral de Monterrey", "Paseo Santa Lucía"): 0.7,
+    ("Cerro del Obispado", "Estadio BBVA"): 5.4,
+    ("Paseo Santa Lucía", "Museo de Historia Mexicana"): 0.8,
+    ("Estadio BBVA", "Parque Fundidora"): 8.0
+}
+
+POSICIONES = {
+    "Macroplaza": (0.5, 0.5),
+    "Parque Fundidora": (0.2, 0.7),
+    "Museo del Acero": (0.3, 0.3),
+    "Barrio Antiguo": (0.8, 0.6),
+    "Catedral de Monterrey": (0.5, 0.8),
+    "Cerro del Obispado": (0.8, 0.2),
+    "Estadio BBVA": (0.2, 0.2),
+    "Paseo Santa Lucía": (0.3, 0.7),
+    "Museo de Historia Mexicana": (0.7, 0.75)
+}
+
+def normalizar_nombre(texto: str) -> str:
+    """Minúsculas, sin acentos ni signos y con espacios simples: "Paseo Santa Lucía" → "paseo santa lucia"."""
+    texto = unicodedata.normalize("NFKD", texto.casefold())
+    texto = "".join(c if c.isalnum() else " " for c in texto if not unicodedata.combining(c))
+    return " ".join(texto.split())
+
+
+def _levenshtein(a: str, b: str, limite: int) -> int:
+    """Distancia de edición entre ``a`` y ``b`` (vectores de bits de Myers/Hyyrö).
+
+    Si supera ``limite`` devuelve ``limite + 1``.
+    """
+    if abs(len(a) - len(b)) > limite:
+        return limite + 1
+    if not a or not b:
+        return min(len(a) + len(b), limite + 1)
+    coincidencias = {}
+    for i, caracter in enumerate(a):
+        coincidencias[caracter] = coincidencias.get(caracter, 0) | (1 << i)
+    completo = (1 << len(a)) - 1
+    ultimo = 1 << (len(a) - 1)
+    positivos, negativos, distancia = completo, 0, len(a)
+    for caracter in b:
+        eq = coincidencias.get(caracter, 0)
+        xv = eq | negativos
+        xh = (((eq & positivos) + positivos) ^ positivos) | eq
+        ph = negativos | (~(xh | positivos) & completo)
+        mh = positivos & xh
+        if ph & ultimo:
+            distancia += 1
+        elif mh & ultimo:
+            distancia -= 1
+        ph = ((ph << 1) | 1) & completo
+        mh = (mh << 1) & completo
+        positivos = mh | (~(xv | ph) & completo)
+        negativos = ph & xv
+    return min(distancia, limite + 1)
+
+
+_ANCHO_CODIGOS = 16  # Bytes por palabra en IndiceNombres._codigos
+
+
+def _codigos_palabra(palabra: str) -> bytes:
+    """Palabra en latin-1 rellenada con ceros a ``_ANCHO_CODIGOS``; ceros si no cabe o no es latin-1."""
+    try:
+        codigos = palabra.encode("latin-1")
+    except UnicodeEncodeError:
+        return bytes(_ANCHO_CODIGOS)
+    if len(codigos) > _ANCHO_CODIGOS:
+        return bytes(_ANCHO_CODIGOS)
+    return codigos.ljust(_ANCHO_CODIGOS, b"\0")
+
+
+def _levenshtein_lote(a: str, codigos, longitudes, limite: int):
+    """``_levenshtein`` de ``a`` contra muchas palabras a la vez, una columna de NumPy por carácter.
+
+    ``codigos`` son filas de ``_codigos_palabra`` y ``longitudes`` sus longitudes;
+    ``a`` debe ser latin-1 de 1 a 64 caracteres.
+    """
+    tabla = np.zeros(256, dtype=np.uint64)
+    for i, codigo in enumerate(a.encode("latin-1")):
+        tabla[codigo] |= np.uint64(1 << i)
+    completo = np.uint64((1 << len(a)) - 1)
+    ultimo = np.uint64(1 << (len(a) - 1))
+    uno = np.uint64(1)
+    positivos = np.full(len(codigos), completo, dtype=np.uint64)
+    negativos = np.zeros(len(codigos), dtype=np.uint64)
+    distancias = np.full(len(codigos), len(a), dtype=np.int64)
+    for j in range(int(longitudes.max(initial=0))):
+        eq = tabla[codigos[:, j]]
+        xv = eq | negativos
+        xh = (((eq & positivos) + positivos) ^ positivos) | eq
+        ph = negativos | (~(xh | positivos) & completo)
+        mh = positivos & xh
+        activas = longitudes > j  # Las palabras ya terminadas conservan su distancia
+        distancias += activas & ((ph & ultimo) != 0)
+        distancias -= activas & ((ph & ultimo) == 0) & ((mh & ultimo) != 0)
+        ph = ((ph << uno) | uno) & completo
+        mh = (mh << uno) & completo
+        positivos = mh | (~(xv | ph) & completo)
+        negativos = ph & xv
+    return np.minimum(distancias, limite + 1)
+
+
+def _bigramas(palabra: str):
+    """Bigramas de ``#palabra#``; las repeticiones se numeran ("ee", "ee2", ...) para contar multiconjuntos."""
+    texto = f"#{palabra}#"
+    vistos = {}
+    for i in range(len(texto) - 1):
+        bigrama = texto[i:i + 2]
+        vistos[bigrama] = vistos.get(bigrama, 0) + 1
+        yield bigrama if vistos[bigrama] == 1 else f"{bigrama}{vistos[bigrama]}"
+
+
+def _conteo_letras(palabra: str) -> bytearray:
+    """Histograma de caracteres en 32 cubetas (``ord & 31``) para el filtro de distancia de bolsa."""
+    conteo = bytearray(32)
+    for caracter in palabra:
+        cubeta = ord(caracter) & 31
+        conteo[cubeta] = min(conteo[cubeta] + 1, 255)
+    return conteo
+
+
+class IndiceNombres:
+    """Índice de nombres tolerante a errores: trie para autocompletar e índice de bigramas para typos.
+
+    Ambos trabajan sobre las palabras normalizadas de cada nombre, así que
+    "museo acero" encuentra "Museo del Acero" y "Catedral Monterey" encuentra
+    "Catedral de Monterrey". ``agregar`` y ``eliminar`` lo actualizan sin reconstruirlo.
+
+    La búsqueda aproximada usa el filtro de conteo de bigramas: una palabra a
+    distancia de edición ``k`` de la consulta comparte al menos
+    ``len(consulta) + 1 - 2k`` bigramas con ella, contando repeticiones. El
+    conteo se hace con NumPy; después se descartan los que difieren en longitud
+    o en el histograma de letras (distancia de bolsa, otra cota inferior) en
+    más de ``k``, y los que quedan se comparan con Levenshtein en lote.
+    """
+    def __init__(self, nombres=()):
+        self._palabras = {}   # nombre → tupla de palabras normalizadas
+        self._por_palabra = defaultdict(set)  # palabra → nombres que la contienen
+        self._trie = {}       # carácter → subtrie; la clave "" guarda la palabra completa
+        self._vocabulario = []  # id de palabra → palabra (None si el id está libre)
+        self._longitudes = array("i")  # id de palabra → longitud (-1 si está libre)
+        self._letras = bytearray()  # id de palabra → 32 bytes de ``_conteo_letras``
+        self._codigos = bytearray()  # id de palabra → ``_codigos_palabra`` para ``_levenshtein_lote``
+        self._id_palabra = {}
+        self._ids_libres = []  # ids de palabras que ya no usa ningún nombre, para reutilizar
+        self._postings = defaultdict(lambda: array("i"))  # bigrama → ids de palabras
+        for nombre in nombres:
+            self.agregar(nombre)
+
+    def __len__(self):
+        return len(self._palabras)
+
+    def __contains__(self, nombre):
+        return nombre in self._palabras
+
+    def agregar(self, nombre: str):
+        if nombre in self._palabras:
+            return
+        palabras = tuple(normalizar_nombre(nombre).split())
+        self._palabras[nombre] = palabras
+        for palabra in palabras:
+            if not self._por_palabra[palabra]:
+                self._agregar_palabra(palabra)
+            self._por_palabra[palabra].add(nombre)
+
+    def eliminar(self, nombre: str):
+        palabras = self._palabras.pop(nombre, None)
+        if palabras is None:
+            return
+        for palabra in palabras:
+            nombres = self._por_palabra[palabra]
+            nombres.discard(nombre)
+            if not nombres:  # El conjunto de nombres hace de contador de referencias
+                del self._por_palabra[palabra]
+                self._quitar_palabra(palabra)
+
+    def _agregar_palabra(self, palabra: str):
+        nodo = self._trie
+        for caracter in palabra:
+            nodo = nodo.setdefault(caracter, {})
+        nodo[""] = palabra
+        letras = _conteo_letras(palabra)
+        if self._ids_libres:
+            i = self._ids_libres.pop()
+            self._vocabulario[i] = palabra
+            self._longitudes[i] = len(palabra)
+            self._letras[32 * i:32 * (i + 1)] = letras
+            self._codigos[_ANCHO_CODIGOS * i:_ANCHO_CODIGOS * (i + 1)] = _codigos_palabra(palabra)
+        else:
+            i = len(self._vocabulario)
+            self._vocabulario.append(palabra)
+            self._longitudes.append(len(palabra))
+            self._letras += letras
+            self._codigos += _codigos_palabra(palabra)
+        self._id_palabra[palabra] = i
+        for bigrama in _bigramas(palabra):
+            self._postings[bigrama].append(i)
+
+    def _quitar_palabra(self, palabra: str):
+        """Saca la palabra del trie y del índice de bigramas y deja su id libre."""
+        self._quitar_del_trie(palabra)
+        i = self._id_palabra.pop(palabra)
+        for bigrama in _bigramas(palabra):
+            ids = self._postings[bigrama]
+            # El orden de las listas no importa: se busca con NumPy y se tapa el hueco con el último
+            j = int(np.flatnonzero(np.frombuffer(ids, dtype=np.int32) == i)[0])
+            ids[j] = ids[-1]
+            ids.pop()
+            if not ids:
+                del self._postings[bigrama]
+        self._vocabulario[i] = None
+        self._longitudes[i] = -1
+        self._letras[32 * i:32 * (i + 1)] = bytes(32)
+        self._codigos[_ANCHO_CODIGOS * i:_ANCHO_CODIGOS * (i + 1)] = bytes(_ANCHO_CODIGOS)
+        self._ids_libres.append(i)
+
+    def _quitar_del_trie(self, palabra: str):
+        camino = [self._trie]
+        for caracter in palabra:
+            camino.append(camino[-1][caracter])
+        del camino[-1][""]
+        for caracter, nodo in zip(reversed(palabra), reversed(camino[:-1])):
+            if nodo[caracter]:
+                break
+            del nodo[caracter]
+
+    def _palabras_con_prefijo(self, prefijo: str):
+        nodo = self._trie
+        for caracter in prefijo:
+            nodo = nodo.get(caracter)
+            if nodo is None:
+                return
+        pila = [nodo]
+        while pila:
+            nodo = pila.pop()
+            for caracter, hijo in nodo.items():
+                if caracter == "":
+                    yield hijo
+                else:
+                    pila.append(hijo)
+
+    def _palabras_cercanas(self, palabra: str, radio: int):
+        """Devuelve ``{palabra: distancia}`` del vocabulario dentro de ``radio``."""
+        if radio == 0:
+            return {palabra: 0} if palabra in self._por_palabra else {}
+        bigramas = list(_bigramas(palabra))
+        # Vistas sin copia de los array("i"); se sueltan al salir para que puedan seguir creciendo
+        listas = [np.frombuffer(self._postings[b], dtype=np.int32) for b in bigramas if b in self._postings]
+        minimo = len(bigramas) - 2 * radio
+        if minimo <= 0:
+            candidatos = np.arange(len(self._vocabulario))  # La consulta es demasiado corta para filtrar
+        elif not listas:
+            return {}
+        else:
+            conteo = np.bincount(np.concatenate(listas), minlength=len(self._vocabulario))
+            candidatos = np.flatnonzero(conteo >= minimo)
+        longitudes = np.frombuffer(self._longitudes, dtype=np.int32)[candidatos]
+        cerca = np.abs(longitudes - len(palabra)) <= radio
+        candidatos, longitudes = candidatos[cerca], longitudes[cerca]
+        letras = np.frombuffer(self._letras, dtype=np.uint8).reshape(-1, 32)[candidatos]
+        diferencia = letras.astype(np.int16) - np.frombuffer(_conteo_letras(palabra), dtype=np.uint8)
+        sobran = np.maximum(diferencia, 0).sum(axis=1)
+        faltan = np.maximum(-diferencia, 0).sum(axis=1)
+        cerca = np.maximum(sobran, faltan) <= radio
+        candidatos, longitudes = candidatos[cerca], longitudes[cerca]
+        encontradas = {}
+        if len(candidatos) > 64 and len(palabra) <= 64 and max(map(ord, palabra)) < 256:
+            # Con pocos candidatos sale más barato compararlos uno a uno, igual que las
+            # palabras que no caben en ``_codigos`` (primer byte 0)
+            codigos = np.frombuffer(self._codigos, dtype=np.uint8).reshape(-1, _ANCHO_CODIGOS)[candidatos]
+            en_lote = codigos[:, 0] != 0
+            distancias = _levenshtein_lote(palabra, codigos[en_lote], longitudes[en_lote], radio)
+            cercanas = distancias <= radio
+            for i, d in zip(candidatos[en_lote][cercanas].tolist(), distancias[cercanas].tolist()):
+                encontradas[self._vocabulario[i]] = d
+            candidatos = candidatos[~en_lote]
+        for i in candidatos.tolist():
+            texto = self._vocabulario[i]
+            if texto is not None:
+                d = _levenshtein(palabra, texto, radio)
+                if d <= radio:
+                    encontradas[texto] = d
+        return encontradas
+
+    def autocompletar(self, texto: str, limite: int = 10):
+        """Nombres en los que cada palabra de ``texto`` es prefijo de alguna de sus palabras."""
+        consulta = normalizar_nombre(texto).split()
+        if not consulta:
+            return []
+        # Se parte de la palabra más larga (la más selectiva) y se filtra con las demás
+        base = max(consulta, key=len)
+        candidatos = set()
+        for palabra in self._palabras_con_prefijo(base):
+            candidatos.update(self._por_palabra[palabra])
+        resultado = [nombre for nombre in candidatos
+                     if all(any(p.startswith(q) for p in self._palabras[nombre]) for q in consulta)]
+        return sorted(resultado, key=lambda n: (len(n), n))[:limite]
+
+    def buscar_aproximado(self, texto: str, max_errores: int = 2, limite: int = 10):
+        """Nombres con palabras a distancia de edición ≤ ``max_errores`` de cada palabra de ``texto``.
+
+        El radio se reduce para palabras cortas (0 hasta 3 letras, 1 hasta 5).
+
+        Returns:
+            list: pares (nombre, errores totales) ordenados de mejor a peor.
+        """
+        consulta = normalizar_nombre(texto).split()
+        if not consulta:
+            return []
+        cercanas = []
+        for q in consulta:
+            radio = min(max_errores, 0 if len(q) <= 3 else 1 if len(q) <= 5 else 2)
+            cercanas.append(self._palabras_cercanas(q, radio))
+        # Se empieza por la palabra más selectiva; las demás solo se comprueban en sus candidatos
+        cercanas.sort(key=lambda grupo: sum(len(self._por_palabra[p]) for p in grupo))
+        puntajes = {}
+        for palabra, d in cercanas[0].items():
+            for nombre in self._por_palabra[palabra]:
+                if d < puntajes.get(nombre, math.inf):
+                    puntajes[nombre] = d
+        for grupo in cercanas[1:]:
+            siguientes = {}
+            for nombre, total in puntajes.items():
+                distancias = [grupo[p] for p in self._palabras[nombre] if p in grupo]
+                if distancias:
+                    siguientes[nombre] = total + min(distancias)
+            puntajes = siguientes
+        return sorted(puntajes.items(), key=lambda par: (par[1], len(par[0]), par[0]))[:limite]
+
 
 class GrafoTurismo:
     """Implementa un grafo con Macroplaza como punto de salida y límite de ubicaciones."""
     def __init__(self):
         self.nodos = set(["Macroplaza"]) # Macroplaza es el punto de partida
         self.distancias = defaultdict(dict) 
-        self.posiciones = {
-            "Macroplaza": (0.5, 0.5),
-            "Parque Fundidora": (0.2, 0.7),
-            "Museo del Acero": (0.3, 0.3),
-            "Barrio Antiguo": (0.8, 0.6),
-            "Catedral de Monterrey": (0.5, 0.8),
-            "Cerro del Obispado": (0.8, 0.2),
-            "Estadio BBVA": (0.2, 0.2),
-            "Paseo Santa Lucía": (0.3, 0.7),
-            "Museo de Historia Mexicana": (0.7, 0.75)
-        }
+        self.posiciones = dict(POSICIONES)
+        self._indice = None  # IndiceNombres, se construye en la primera búsqueda
     
     def agregar_ubicacion(self, nombre: str):
         if len(self.nodos) >= 6:  # Macroplaza + 5 ubicaciones
@@ -31,6 +396,8 @@ class GrafoTurismo:
             return f"Error: '{nombre}' ya existe."
         
         self.nodos.add(nombre)
+        if self._indice is not None:
+            self._indice.agregar(nombre)
         return f"Ubicación '{nombre}' añadida."
     
     def eliminar_ubicacion(self, nombre: str):
@@ -46,11 +413,35 @@ class GrafoTurismo:
                 del self.distancias[origen][nombre]
             if origen == nombre:
                 del self.distancias[origen]
+        if self._indice is not None and nombre not in self.posiciones:
+            self._indice.eliminar(nombre)
         
         return f"Ubicación '{nombre}' eliminada."
     
+    def indice_nombres(self) -> IndiceNombres:
+        """Índice de búsqueda sobre las ubicaciones conocidas (con posición) y las seleccionadas."""
+        if self._indice is None:
+            self._indice = IndiceNombres(set(self.posiciones) | self.nodos)
+        return self._indice
+    
+    def buscar_ubicacion(self, texto: str, max_errores: int = 2, limite: int = 10):
+        """Ubicaciones que coinciden con ``texto`` aunque tenga errores, acentos o mayúsculas distintas."""
+        return self.indice_nombres().buscar_aproximado(texto, max_errores, limite)
+    
+    def autocompletar_ubicacion(self, prefijo: str, limite: int = 10):
+        return self.indice_nombres().autocompletar(prefijo, limite)
+    
     def conectar_ubicaciones_densamente(self, distancias_predefinidas):
-        """Conecta cada ubicación con Macroplaza y con al menos 2 nodos adicionales."""
+        """Conecta cada ubicación con Macroplaza y con al menos 2 nodos adicionales.
+
+        Acepta el diccionario de pares predefinidos o una red ``GrafoCSR`` cargada de disco.
+        """
+        if isinstance(distancias_predefinidas, GrafoCSR):
+            red = distancias_predefinidas
+            for nodo, pos in red.posiciones_de(self.nodos).items():
+                self.posiciones.setdefault(nodo, pos)
+            distancias_predefinidas = red.aristas_entre(self.nodos)
+
         for nodo in self.nodos:
             if nodo != "Macroplaza":
                 if "Macroplaza" not in self.distancias.get(nodo, {}):
@@ -105,14 +496,16 @@ class GrafoTurismo:
         visitados = set(["Macroplaza"])
         distancia_total = 0
         
+        # Recorrer en orden alfabético para que los empates se resuelvan igual en cada ejecución
+        nodos_ordenados = sorted(self.nodos)
         while visitados != self.nodos:
             ultimo = ruta[-1]
-            vecinos = [n for n in self.nodos 
+            vecinos = [n for n in nodos_ordenados 
                       if n not in visitados 
                       and n in self.distancias.get(ultimo, {})]
             
             if not vecinos:
-                vecinos = [n for n in self.nodos 
+                vecinos = [n for n in nodos_ordenados 
                           if n not in visitados 
                           and "Macroplaza" in self.distancias.get(n, {})]
                 if not vecinos:
@@ -132,41 +525,1569 @@ class GrafoTurismo:
         
         return ruta, f"Distancia total: {distancia_total:.1f} km"
     
+    def calcular_ruta_multiarranque(self, intentos: int = 32, semilla: int = 0, destinos=None, procesos=None):
+        """TSP con varios arranques aleatorios en paralelo y selección determinista del mejor.
+
+        El arranque 0 es el vecino más cercano puro; los demás eligen al azar entre
+        los candidatos más cercanos. Todos se mejoran con 2-opt. Cada arranque
+        recibe su propia semilla derivada de ``semilla``, así que el resultado
+        no depende del número de procesos ni del orden en que terminen.
+        """
+        if intentos < 1:
+            return None, "Error: Se necesita al menos un arranque"
+        if destinos is None:
+            destinos = [n for n in self.nodos if n != "Macroplaza"]
+        nombres = ["Macroplaza"] + sorted(set(destinos) - {"Macroplaza"})
+        if len(nombres) < 2:
+            return None, "Se necesitan al menos 2 ubicaciones"
+
+        matriz, predecesores, todos = self.matriz_caminos(nombres)
+        semillas = np.random.SeedSequence(semilla).spawn(intentos)
+        tareas = list(enumerate(semillas))
+        if procesos == 1:
+            _iniciar_trabajador(matriz)
+            resultados = [_arranque_aleatorio(tarea) for tarea in tareas]
+        else:
+            with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_trabajador,
+                                     initargs=(matriz,)) as ejecutor:
+                resultados = list(ejecutor.map(_arranque_aleatorio, tareas, chunksize=4))
+
+        costo, _, tour = min(resultados)
+        if not np.isfinite(costo):
+            return None, "No se pudo calcular una ruta completa"
+        return _expandir_tour(tour, predecesores, todos), f"Distancia total: {costo:.1f} km"
+
     def obtener_ubicaciones(self):
         return sorted(self.nodos)
 
+    def exportar_red_csr(self, ruta: str, distancias_predefinidas):
+        """Guarda la red completa (pares predefinidos y posiciones) en formato CSR."""
+        adyacencia = defaultdict(dict)
+        for (origen, destino), distancia in distancias_predefinidas.items():
+            adyacencia[origen][destino] = distancia
+            adyacencia[destino][origen] = distancia
+        escribir_csr(ruta, adyacencia, self.posiciones)
+
+    def matriz_caminos(self, nombres, ejecutor=None):
+        """Matriz de caminos más cortos entre ``nombres`` usando solo las aristas de ``self.distancias``.
+
+        Los pares sin camino quedan en infinito. La red se pasa a listas de
+        vecinos por índice y se corre un Dijkstra por nombre, repartidos en
+        ``ejecutor`` si se da uno.
+
+        Returns:
+            tuple: (matriz, predecesores, todos) donde ``predecesores[i]`` es el árbol de
+            Dijkstra desde ``nombres[i]`` como índices de ``todos`` (-1 = sin predecesor), para
+            reconstruir cada tramo con ``_expandir_tour``. ``todos`` empieza por ``nombres``.
+        """
+        indices = {nombre: i for i, nombre in enumerate(nombres)}
+        for origen, destinos in self.distancias.items():
+            for nombre in chain((origen,), destinos):
+                indices.setdefault(nombre, len(indices))
+        vecinos = [[] for _ in indices]
+        for origen, destinos in self.distancias.items():
+            vecinos[indices[origen]] = [(indices[destino], distancia) for destino, distancia in destinos.items()]
+
+        n = len(nombres)
+        if ejecutor is None:
+            resultados = _caminos_desde((vecinos, range(n), n))
+        else:
+            bloques = ((vecinos, range(k, min(k + 256, n)), n) for k in range(0, n, 256))
+            resultados = list(chain.from_iterable(ejecutor.map(_caminos_desde, bloques)))
+        matriz = np.frombuffer(b"".join(distancias for distancias, _ in resultados)).reshape(n, n)
+        return matriz, [arbol for _, arbol in resultados], list(indices)
+
+    def matriz_distancias(self, nombres, jerarquia=None):
+        """Matriz de distancias entre ``nombres``.
+
+        Usa la distancia directa de ``self.distancias`` cuando existe y, si no,
+        la estimación euclidiana escalada a km (la misma de la conexión densa).
+        Las estimaciones no son tramos transitables; para rutas que se puedan
+        recorrer tal cual está ``matriz_caminos``.
+        Los pares sin conexión ni posición quedan en infinito. Con una
+        ``JerarquiaContraccion`` se usan en cambio los caminos más cortos de la red completa.
+        """
+        if jerarquia is not None:
+            return jerarquia.matriz(nombres)
+        n = len(nombres)
+        coordenadas = np.array([self.posiciones.get(nombre, (np.nan, np.nan)) for nombre in nombres],
+                               dtype=float).reshape(n, 2)
+        diferencias = coordenadas[:, None, :] - coordenadas[None, :, :]
+        matriz = np.sqrt((diferencias ** 2).sum(axis=2)) * 3
+        matriz[np.isnan(matriz)] = np.inf
+        indices = {nombre: i for i, nombre in enumerate(nombres)}
+        for i, origen in enumerate(nombres):
+            for destino, distancia in self.distancias.get(origen, {}).items():
+                j = indices.get(destino)
+                if j is not None:
+                    matriz[i, j] = distancia
+        np.fill_diagonal(matriz, 0.0)
+        return matriz
+
+    def evaluar_itinerarios(self, itinerarios, referencia: bool = True):
+        """Puntúa en bloque muchos recorridos (listas ordenadas de nombres) sobre ``self.distancias``.
+
+        Los recorridos se convierten a una matriz de índices rellenada y todos
+        los tramos se evalúan a la vez con indexación de NumPy.
+
+        Returns:
+            dict: arreglos por recorrido con ``longitud`` (suma de los tramos con conexión),
+            ``violaciones`` (tramos sin conexión directa o con paradas desconocidas) y, con
+            ``referencia``, la longitud del recorrido del solver sobre las mismas paradas y la
+            ``mejora`` posible (longitud - referencia). Ambas quedan en NaN para recorridos
+            abiertos o con violaciones; el solver se ejecuta una vez por conjunto de paradas distinto.
+        """
+        itinerarios = list(itinerarios)  # Se recorre dos veces; acepta generadores
+        nombres = sorted(set(self.distancias) | self.nodos)
+        indices = {nombre: i for i, nombre in enumerate(nombres)}
+        desconocido, relleno = len(nombres), len(nombres) + 1
+        matriz = np.full((len(nombres) + 2, len(nombres) + 2), np.nan)
+        for origen in nombres:
+            i = indices[origen]
+            for destino, distancia in self.distancias.get(origen, {}).items():
+                if destino in indices:
+                    matriz[i, indices[destino]] = distancia
+        np.fill_diagonal(matriz, 0.0)
+        matriz[desconocido, :] = matriz[:, desconocido] = np.nan
+        matriz[relleno, :] = matriz[:, relleno] = 0.0
+
+        tours, largos = _arreglo_itinerarios(itinerarios, indices, desconocido, relleno)
+        longitud, violaciones = _puntuar_itinerarios(tours, matriz)
+        resultado = {"longitud": longitud, "violaciones": violaciones}
+        if not referencia:
+            return resultado
+
+        filas = np.arange(len(tours))
+        cerrados = ((largos > 1) & (tours[filas, 0] == tours[filas, np.maximum(largos - 1, 0)])
+                    & (violaciones == 0))
+        # Conjunto de paradas de cada recorrido: fila ordenada sin repetidos (rellenados al final)
+        conjuntos = np.sort(tours[cerrados], axis=1)
+        conjuntos[:, 1:][conjuntos[:, 1:] == conjuntos[:, :-1]] = relleno
+        conjuntos.sort(axis=1)
+        unicos, inverso = np.unique(conjuntos, axis=0, return_inverse=True)
+        costos = np.empty(len(unicos))
+        for k, fila in enumerate(unicos):
+            paradas = fila[fila != relleno]
+            submatriz = matriz[np.ix_(paradas, paradas)]
+            _, costos[k] = _resolver_tour(np.where(np.isnan(submatriz), np.inf, submatriz))
+        resultado["referencia"] = np.full(len(tours), np.nan)
+        resultado["referencia"][cerrados] = costos[inverso.reshape(-1)]
+        resultado["referencia"][~np.isfinite(resultado["referencia"])] = np.nan
+        resultado["mejora"] = longitud - resultado["referencia"]
+        return resultado
+
+    def calcular_rutas_guias(self, k: int, destinos=None, capacidad=None, procesos=None):
+        """Reparte los destinos entre ``k`` guías y calcula un recorrido por guía.
+
+        Los destinos se agrupan por barrido angular alrededor de Macroplaza en
+        ``k`` grupos del mismo tamaño, cada recorrido se resuelve en paralelo
+        (vecino más cercano + 2-opt) y luego se mueven destinos entre grupos
+        vecinos mientras baje la distancia total, sin que ningún grupo pase de
+        ``capacidad`` destinos. Las distancias son caminos más cortos sobre
+        ``self.distancias`` y cada ruta incluye las ubicaciones intermedias de
+        sus tramos. Con ``procesos`` distinto de 1 se reutiliza un mismo grupo
+        de procesos entre llamadas.
+
+        Returns:
+            tuple: (rutas, distancias) con una ruta y su distancia en km por guía,
+            o (None, mensaje) si no se puede calcular.
+        """
+        if destinos is None:
+            destinos = [n for n in self.nodos if n != "Macroplaza"]
+        destinos = sorted(set(destinos) - {"Macroplaza"})
+        if not destinos:
+            return None, "Se necesitan al menos 2 ubicaciones"
+        if k < 1:
+            return None, "Error: Se necesita al menos un guía"
+        sin_posicion = [n for n in ["Macroplaza"] + destinos if n not in self.posiciones]
+        if sin_posicion:
+            return None, f"Error: Sin posición para {', '.join(sin_posicion)}"
+
+        k = min(k, len(destinos))
+        capacidad = capacidad or math.ceil(len(destinos) / k * 1.2)  # 20% de holgura para rebalancear
+        if capacidad * k < len(destinos):
+            return None, f"Error: {k} guías con capacidad {capacidad} no alcanzan para {len(destinos)} destinos"
+
+        nombres = ["Macroplaza"] + destinos
+        ejecutor = None if procesos == 1 else _ejecutor_compartido(procesos)
+        matriz, predecesores, todos = self.matriz_caminos(nombres, ejecutor)
+        # Si todo destino va y vuelve de Macroplaza, todos los pares tienen camino
+        sin_camino = [nombres[j] for j in range(1, len(nombres))
+                      if not (np.isfinite(matriz[0, j]) and np.isfinite(matriz[j, 0]))]
+        if sin_camino:
+            return None, f"Error: Sin camino desde Macroplaza para {', '.join(sin_camino)}"
+        grupos = _particion_por_barrido(np.array([self.posiciones[n] for n in nombres]), k)
+
+        submatrices = [matriz[np.ix_([0] + grupo, [0] + grupo)] for grupo in grupos]
+        if ejecutor is None or k == 1:
+            resultados = [_resolver_tour(sub) for sub in submatrices]
+        else:
+            resultados = list(ejecutor.map(_resolver_tour, submatrices))
+        tours = [[([0] + grupo)[i] for i in orden] for grupo, (orden, _) in zip(grupos, resultados)]
+
+        _rebalancear_tours(tours, matriz, capacidad)
+
+        # Cada tramo entre paradas se sustituye por su camino real en self.distancias
+        rutas = [_expandir_tour(tour, predecesores, todos) for tour in tours]
+        distancias = [round(_costo_tour(tour, matriz), 1) for tour in tours]
+        return rutas, distancias
+
+
+class GrafoBase:
+    """Red inmutable (conexiones y posiciones) compartida por todas las sesiones.
+
+    Se construye una vez y solo se lee, así que varias sesiones e hilos pueden
+    consultarla sin bloqueos.
+    """
+    def __init__(self, distancias_predefinidas=DISTANCIAS_PREDEFINIDAS, posiciones=POSICIONES):
+        adyacencia = defaultdict(dict)
+        for (origen, destino), distancia in distancias_predefinidas.items():
+            adyacencia[origen][destino] = distancia
+            adyacencia[destino][origen] = distancia
+        self.adyacencia = MappingProxyType({origen: MappingProxyType(vecinos)
+                                            for origen, vecinos in adyacencia.items()})
+        self.posiciones = MappingProxyType(dict(posiciones))
+        self._indice = None
+
+    def indice_nombres(self) -> IndiceNombres:
+        """Índice de nombres de la base, construido una vez y compartido por las sesiones."""
+        if self._indice is None:
+            self._indice = IndiceNombres(set(self.posiciones) | set(self.adyacencia))
+        return self._indice
+
+
+class SesionTurismo(GrafoTurismo):
+    """Selección de un usuario superpuesta a un ``GrafoBase`` compartido (copia en escritura).
+
+    La sesión solo guarda sus nodos seleccionados, las aristas que añade y las
+    posiciones nuevas; las conexiones de la base entre nodos seleccionados se
+    ven a través de ``distancias`` sin copiarse. La memoria por sesión es
+    O(selección) y no O(red).
+    """
+    def __init__(self, base: GrafoBase):
+        self.base = base
+        self.nodos = set(["Macroplaza"])
+        self.aristas_propias = {}  # origen → {destino: distancia} añadidas por la sesión
+        self.distancias = _DistanciasSesion(self)
+        self.posiciones = ChainMap({}, base.posiciones)
+        self._indice = None  # Las búsquedas usan el índice de la base, que la sesión no modifica
+
+    def indice_nombres(self) -> IndiceNombres:
+        return self.base.indice_nombres()
+
+    def eliminar_ubicacion(self, nombre: str):
+        if nombre == "Macroplaza":
+            return "No se puede eliminar Macroplaza"
+
+        if nombre not in self.nodos:
+            return f"Error: '{nombre}' no existe."
+
+        self.nodos.remove(nombre)
+        self.aristas_propias.pop(nombre, None)
+        for vecinos in self.aristas_propias.values():
+            vecinos.pop(nombre, None)
+
+        return f"Ubicación '{nombre}' eliminada."
+
+    def conectar_ubicaciones_densamente(self, distancias_predefinidas=None):
+        """Como en GrafoTurismo; sin argumento usa directamente las conexiones de la base."""
+        super().conectar_ubicaciones_densamente(distancias_predefinidas or {})
+
+
+class _VecinosSesion(MutableMapping):
+    """Vecinos de un nodo: aristas propias de la sesión sobre las de la base."""
+    __slots__ = ("_sesion", "_origen")
+
+    def __init__(self, sesion, origen):
+        self._sesion = sesion
+        self._origen = origen
+
+    def _base(self):
+        """Vecinos de la base visibles: ambos extremos deben estar seleccionados."""
+        if self._origen not in self._sesion.nodos:
+            return {}
+        return self._sesion.base.adyacencia.get(self._origen, {})
+
+    def __getitem__(self, destino):
+        propias = self._sesion.aristas_propias.get(self._origen)
+        if propias and destino in propias:
+            return propias[destino]
+        if destino in self._sesion.nodos:
+            return self._base()[destino]
+        raise KeyError(destino)
+
+    def __setitem__(self, destino, distancia):
+        try:
+            if self[destino] == distancia:
+                return  # Ya visible con el mismo valor: no se copia nada
+        except KeyError:
+            pass
+        self._sesion.aristas_propias.setdefault(self._origen, {})[destino] = distancia
+
+    def __delitem__(self, destino):
+        propias = self._sesion.aristas_propias.get(self._origen, {})
+        if destino in propias:
+            del propias[destino]
+        elif destino in self:
+            raise TypeError("Las conexiones de la red base son de solo lectura")
+        else:
+            raise KeyError(destino)
+
+    def __iter__(self):
+        propias = self._sesion.aristas_propias.get(self._origen, {})
+        yield from propias
+        nodos = self._sesion.nodos
+        for destino in self._base():
+            if destino in nodos and destino not in propias:
+                yield destino
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class _DistanciasSesion(MutableMapping):
+    """Vista ``{origen: {destino: distancia}}`` de una sesión, como el ``defaultdict`` de GrafoTurismo."""
+    __slots__ = ("_sesion",)
+
+    def __init__(self, sesion):
+        self._sesion = sesion
+
+    def __getitem__(self, origen):
+        return _VecinosSesion(self._sesion, origen)
+
+    def __setitem__(self, origen, vecinos):
+        vista = _VecinosSesion(self._sesion, origen)
+        for destino, distancia in vecinos.items():
+            vista[destino] = distancia
+
+    def __delitem__(self, origen):
+        self._sesion.aristas_propias.pop(origen, None)
+
+    def __contains__(self, origen):
+        return any(True for _ in _VecinosSesion(self._sesion, origen))
+
+    def __iter__(self):
+        propias = self._sesion.aristas_propias
+        yield from (origen for origen, vecinos in propias.items() if vecinos)
+        for origen in self._sesion.nodos:
+            if not propias.get(origen) and origen in self:
+                yield origen
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return repr({origen: dict(self[origen]) for origen in self})
+
+
+def _arreglo_itinerarios(itinerarios, indices, desconocido: int, relleno: int):
+    """Convierte listas de nombres en una matriz (recorridos x paradas) de índices rellenada con ``relleno``.
+
+    Returns:
+        tuple: (matriz int32, número de paradas de cada recorrido).
+    """
+    largos = np.fromiter(map(len, itinerarios), dtype=np.int64, count=len(itinerarios))
+    total = int(largos.sum())
+    codigos = np.fromiter(map(indices.get, chain.from_iterable(itinerarios), repeat(desconocido)),
+                          dtype=np.int32, count=total)
+    tours = np.full((len(largos), max(int(largos.max(initial=0)), 1)), relleno, dtype=np.int32)
+    filas = np.repeat(np.arange(len(largos)), largos)
+    columnas = np.arange(total) - np.repeat(np.cumsum(largos) - largos, largos)
+    tours[filas, columnas] = codigos
+    return tours, largos
+
+
+def _puntuar_itinerarios(tours, matriz):
+    """Longitud y tramos sin conexión de cada recorrido; ``matriz`` tiene NaN donde no hay arista."""
+    tramos = matriz[tours[:, :-1], tours[:, 1:]]
+    faltantes = np.isnan(tramos)
+    return np.where(faltantes, 0.0, tramos).sum(axis=1), faltantes.sum(axis=1)
+
+
+def _costo_tour(tour, matriz) -> float:
+    """Suma de las distancias de un recorrido cerrado dado como lista de índices."""
+    return float(sum(matriz[a][b] for a, b in zip(tour, tour[1:])))
+
+
+def _dos_opt(tour, matriz):
+    """Mejora un recorrido cerrado (``tour[0] == tour[-1]``) con 2-opt hasta no encontrar mejoras."""
+    d = matriz.tolist() if isinstance(matriz, np.ndarray) else matriz
+    mejora = True
+    while mejora:
+        mejora = False
+        for i in range(1, len(tour) - 2):
+            a, b = tour[i - 1], tour[i]
+            for j in range(i + 1, len(tour) - 1):
+                c, e = tour[j], tour[j + 1]
+                if d[a][c] + d[b][e] < d[a][b] + d[c][e] - 1e-9:
+                    tour[i:j + 1] = tour[j:i - 1:-1]
+                    b = tour[i]
+                    mejora = True
+    return tour
+
+
+def _resolver_tour(matriz):
+    """Recorrido desde el índice 0 con vecino más cercano + 2-opt; devuelve (tour, costo)."""
+    d = matriz.tolist()
+    pendientes = set(range(1, len(d)))
+    tour = [0]
+    while pendientes:
+        ultimo = tour[-1]
+        siguiente = min(pendientes, key=lambda j: (d[ultimo][j], j))
+        tour.append(siguiente)
+        pendientes.remove(siguiente)
+    tour.append(0)
+    tour = _dos_opt(tour, d)
+    return tour, _costo_tour(tour, d)
+
+
+def _caminos_desde(tarea):
+    """Dijkstra sobre listas de vecinos por índice desde cada origen de ``tarea``.
+
+    Returns:
+        list: (distancias, predecesores) por origen como ``array('d')`` con las distancias a
+        los primeros ``objetivos`` índices y ``array('i')`` con -1 donde no hay predecesor.
+    """
+    vecinos, origenes, objetivos = tarea
+    resultados = []
+    for origen in origenes:
+        distancias = [math.inf] * len(vecinos)
+        predecesores = array("i", [-1]) * len(vecinos)
+        distancias[origen] = 0.0
+        cola = [(0.0, origen)]
+        while cola:
+            d, u = heapq.heappop(cola)
+            if d > distancias[u]:
+                continue
+            for v, w in vecinos[u]:
+                nueva = d + w
+                if nueva < distancias[v]:
+                    distancias[v] = nueva
+                    predecesores[v] = u
+                    heapq.heappush(cola, (nueva, v))
+        resultados.append((array("d", distancias[:objetivos]), predecesores))
+    return resultados
+
+
+def _expandir_tour(tour, predecesores, todos):
+    """Convierte un tour de índices en nombres, sustituyendo cada tramo por su camino más corto."""
+    ruta = [todos[tour[0]]]
+    for a, b in zip(tour, tour[1:]):
+        tramo = [b]
+        while tramo[-1] != a:
+            tramo.append(predecesores[a][tramo[-1]])
+        ruta.extend(todos[i] for i in reversed(tramo[:-1]))
+    return ruta
+
+
+_EJECUTORES = {}  # procesos → ProcessPoolExecutor reutilizado entre llamadas
+
+
+def _ejecutor_compartido(procesos=None):
+    """Devuelve el grupo de procesos compartido para ``procesos`` trabajadores, creándolo una vez."""
+    ejecutor = _EJECUTORES.get(procesos)
+    if ejecutor is None:
+        ejecutor = _EJECUTORES[procesos] = ProcessPoolExecutor(max_workers=procesos)
+    return ejecutor
+
+
+_MATRIZ_TRABAJADOR = None
+
+
+def _iniciar_trabajador(matriz):
+    """Guarda la matriz de distancias una sola vez por proceso trabajador."""
+    global _MATRIZ_TRABAJADOR
+    _MATRIZ_TRABAJADOR = matriz.tolist()
+
+
+def _arranque_aleatorio(tarea, candidatos: int = 3):
+    """Construye y mejora un recorrido; devuelve (costo, índice de arranque, tour).
+
+    El arranque 0 es determinista; los demás eligen al azar entre los
+    ``candidatos`` vecinos más cercanos en cada paso.
+    """
+    indice, semilla = tarea
+    d = _MATRIZ_TRABAJADOR
+    rng = np.random.default_rng(semilla)
+    pendientes = list(range(1, len(d)))
+    tour = [0]
+    while pendientes:
+        ultimo = tour[-1]
+        pendientes.sort(key=lambda j: (d[ultimo][j], j))
+        elegido = 0 if indice == 0 else int(rng.integers(min(candidatos, len(pendientes))))
+        tour.append(pendientes.pop(elegido))
+    tour.append(0)
+    tour = _dos_opt(tour, d)
+    return _costo_tour(tour, d), indice, tour
+
+
+def _particion_por_barrido(coordenadas, k: int):
+    """Agrupa los índices 1..n en ``k`` grupos contiguos por ángulo alrededor del índice 0.
+
+    El barrido empieza en el mayor hueco angular para no partir un grupo natural.
+    """
+    angulos = np.arctan2(coordenadas[1:, 1] - coordenadas[0, 1], coordenadas[1:, 0] - coordenadas[0, 0])
+    orden = np.argsort(angulos, kind="stable")
+    angulos = angulos[orden]
+    huecos = np.diff(np.append(angulos, angulos[0] + 2 * np.pi))
+    orden = np.roll(orden + 1, -(int(np.argmax(huecos)) + 1)).tolist()
+
+    n = len(orden)
+    grupos, inicio = [], 0
+    for g in range(k):
+        tamano = n // k + (1 if g < n % k else 0)
+        grupos.append(orden[inicio:inicio + tamano])
+        inicio += tamano
+    return grupos
+
+
+def _rebalancear_tours(tours, matriz, capacidad: int):
+    """Mueve destinos entre recorridos vecinos (en el barrido) mientras baje la distancia total.
+
+    Cada movimiento quita un destino de un recorrido y lo inserta en la posición
+    más barata del recorrido vecino, respetando la capacidad.
+    """
+    k = len(tours)
+    pares = [(g, (g + 1) % k) for g in range(k) if k > 1] + [((g + 1) % k, g) for g in range(k) if k > 2]
+    mejora = True
+    while mejora:
+        mejora = False
+        for origen, destino in pares:
+            tour_o, tour_d = tours[origen], tours[destino]
+            if len(tour_d) - 2 >= capacidad or len(tour_o) <= 3:
+                continue
+            # ahorro[i]: quitar el i-ésimo destino de tour_o; costo[i, j]: insertarlo tras tour_d[j]
+            a, v, b = np.array(tour_o[:-2]), np.array(tour_o[1:-1]), np.array(tour_o[2:])
+            ahorro = matriz[a, v] + matriz[v, b] - matriz[a, b]
+            p, q = np.array(tour_d[:-1]), np.array(tour_d[1:])
+            costo = matriz[np.ix_(v, p)] + matriz[np.ix_(v, q)] - matriz[p, q]
+            ganancia = ahorro[:, None] - costo
+            i, j = np.unravel_index(int(np.argmax(ganancia)), ganancia.shape)
+            if ganancia[i, j] > 1e-9:
+                tour_d.insert(int(j) + 1, tour_o.pop(int(i) + 1))
+                mejora = True
+
+
+def _relleno(n: int) -> int:
+    """Bytes de relleno para alinear ``n`` a 8."""
+    return -n % 8
+
+
+def escribir_csr_arreglos(ruta: str, nombres, desplazamientos, destinos, pesos, coordenadas):
+    """Escribe una red ya en forma CSR; ``nombres`` debe estar ordenado."""
+    nombres_bytes = [n.encode("utf-8") for n in nombres]
+    desp_nombres = np.zeros(len(nombres_bytes) + 1, dtype="<i8")
+    np.cumsum([len(b) for b in nombres_bytes], out=desp_nombres[1:])
+    blob = b"".join(nombres_bytes)
+
+    secciones = [
+        desp_nombres.tobytes(),
+        blob + b"\x00" * _relleno(len(blob)),
+        np.ascontiguousarray(desplazamientos, dtype="<i8").tobytes(),
+    ]
+    destinos = np.ascontiguousarray(destinos, dtype="<i4").tobytes()
+    secciones.append(destinos + b"\x00" * _relleno(len(destinos)))
+    secciones.append(np.ascontiguousarray(pesos, dtype="<f8").tobytes())
+    secciones.append(np.ascontiguousarray(coordenadas, dtype="<f8").reshape(-1, 2).tobytes())
+
+    crc = 0
+    for seccion in secciones:
+        crc = zlib.crc32(seccion, crc)
+
+    cabecera = _CSR_CABECERA.pack(CSR_MAGIA, CSR_VERSION, len(nombres_bytes),
+                                  len(pesos), len(blob), crc)
+    with open(ruta, "wb") as archivo:
+        archivo.write(cabecera)
+        for seccion in secciones:
+            archivo.write(seccion)
+
+
+def escribir_csr(ruta: str, adyacencia, posiciones=None):
+    """Escribe una red ``{origen: {destino: distancia}}`` en formato CSR."""
+    posiciones = posiciones or {}
+    todos = set(adyacencia)
+    for vecinos in adyacencia.values():
+        todos.update(vecinos)
+    nombres = sorted(todos)
+    ids = {nombre: i for i, nombre in enumerate(nombres)}
+
+    desplazamientos = [0]
+    destinos, pesos = [], []
+    for nombre in nombres:
+        vecinos = sorted(adyacencia.get(nombre, {}).items(), key=lambda par: ids[par[0]])
+        destinos.extend(ids[d] for d, _ in vecinos)
+        pesos.extend(p for _, p in vecinos)
+        desplazamientos.append(len(destinos))
+
+    coordenadas = [posiciones.get(nombre, (np.nan, np.nan)) for nombre in nombres]
+    escribir_csr_arreglos(ruta, nombres, desplazamientos, destinos, pesos,
+                          np.array(coordenadas, dtype="<f8").reshape(-1, 2))
+
+
+class GrafoCSR:
+    """Red de ubicaciones de solo lectura abierta con ``numpy.memmap`` (copia cero).
+
+    Los nombres se guardan ordenados, así que la búsqueda de un nombre es binaria
+    sobre la tabla de cadenas y no requiere construir un diccionario al cargar.
+    """
+    def __init__(self, ruta: str, verificar: bool = False):
+        self.ruta = ruta
+        datos = np.memmap(ruta, dtype=np.uint8, mode="r")
+        if len(datos) < _CSR_CABECERA.size:
+            raise ValueError(f"'{ruta}' no es un archivo CSR válido")
+        magia, version, n, m, bytes_nombres, crc = _CSR_CABECERA.unpack(
+            bytes(datos[:_CSR_CABECERA.size]))
+        if magia != CSR_MAGIA:
+            raise ValueError(f"'{ruta}' no es un archivo CSR válido")
+        if version != CSR_VERSION:
+            raise ValueError(f"Versión CSR {version} no soportada (se esperaba {CSR_VERSION})")
+
+        tamanos = [8 * (n + 1), bytes_nombres, 8 * (n + 1), 4 * m, 8 * m, 16 * n]
+        if len(datos) != _CSR_CABECERA.size + sum(tam + _relleno(tam) for tam in tamanos):
+            raise ValueError(f"'{ruta}' está truncado o tiene un tamaño inesperado")
+
+        self.n_nodos, self.n_aristas = n, m
+        self._datos = datos
+        inicio = _CSR_CABECERA.size
+
+        def seccion(dtype, cantidad):
+            nonlocal inicio
+            tam = np.dtype(dtype).itemsize * cantidad
+            vista = datos[inicio:inicio + tam].view(dtype)
+            inicio += tam + _relleno(tam)
+            return vista
+
+        self._desp_nombres = seccion("<i8", n + 1)
+        self._nombres = seccion(np.uint8, bytes_nombres)
+        self.desplazamientos = seccion("<i8", n + 1)
+        self.destinos = seccion("<i4", m)
+        self.pesos = seccion("<f8", m)
+        self.coordenadas = seccion("<f8", 2 * n).reshape(n, 2)
+
+        if verificar and self._calcular_crc() != crc:
+            raise ValueError(f"Checksum inválido en '{ruta}'")
+
+        # Vistas nativas sin copia: indexar un memoryview es mucho más rápido que un memmap
+        self._mv_desp_nombres = memoryview(self._desp_nombres).cast("B").cast("q")
+        self._mv_nombres = memoryview(self._nombres)
+        self._mv_desplazamientos = memoryview(self.desplazamientos).cast("B").cast("q")
+        self._mv_destinos = memoryview(self.destinos).cast("B").cast("i")
+        self._mv_pesos = memoryview(self.pesos).cast("B").cast("d")
+
+    def _calcular_crc(self, bloque: int = 1 << 24) -> int:
+        crc = 0
+        for i in range(_CSR_CABECERA.size, len(self._datos), bloque):
+            crc = zlib.crc32(self._datos[i:i + bloque], crc)
+        return crc
+
+    def __len__(self):
+        return self.n_nodos
+
+    def __contains__(self, nombre):
+        return self.indice(nombre) is not None
+
+    def _nombre_bytes(self, i: int) -> bytes:
+        return bytes(self._mv_nombres[self._mv_desp_nombres[i]:self._mv_desp_nombres[i + 1]])
+
+    def nombre(self, i: int) -> str:
+        return self._nombre_bytes(i).decode("utf-8")
+
+    def indice(self, nombre: str):
+        """Devuelve el id entero de ``nombre`` o None si no existe."""
+        clave = nombre.encode("utf-8")
+        bajo, alto = 0, self.n_nodos
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            if self._nombre_bytes(medio) < clave:
+                bajo = medio + 1
+            else:
+                alto = medio
+        if bajo < self.n_nodos and self._nombre_bytes(bajo) == clave:
+            return bajo
+        return None
+
+    def vecinos(self, nombre: str):
+        """Devuelve ``{destino: distancia}`` para una ubicación."""
+        i = self.indice(nombre)
+        if i is None:
+            return {}
+        a, b = self._mv_desplazamientos[i], self._mv_desplazamientos[i + 1]
+        return {self.nombre(j): p
+                for j, p in zip(self._mv_destinos[a:b], self._mv_pesos[a:b])}
+
+    def aristas_entre(self, nombres):
+        """Devuelve ``{(origen, destino): distancia}`` restringido a ``nombres``."""
+        nombres = set(nombres)
+        aristas = {}
+        for origen in nombres:
+            for destino, distancia in self.vecinos(origen).items():
+                if destino in nombres:
+                    aristas[(origen, destino)] = distancia
+        return aristas
+
+    def posiciones_de(self, nombres):
+        """Devuelve las coordenadas conocidas de ``nombres``."""
+        posiciones = {}
+        for nombre in nombres:
+            i = self.indice(nombre)
+            if i is not None and not np.isnan(self.coordenadas[i, 0]):
+                posiciones[nombre] = (float(self.coordenadas[i, 0]), float(self.coordenadas[i, 1]))
+        return posiciones
+
+def dijkstra(adyacencia, origen, destino=None):
+    """Dijkstra simple sobre ``{origen: {destino: distancia}}``.
+
+    Returns:
+        tuple: (distancias, predecesores) hasta ``destino`` (o todo el componente).
+    """
+    distancias = {origen: 0.0}
+    predecesores = {origen: None}
+    cola = [(0.0, origen)]
+    asentados = set()
+    while cola:
+        d, u = heapq.heappop(cola)
+        if u in asentados:
+            continue
+        asentados.add(u)
+        if u == destino:
+            break
+        for v, w in adyacencia.get(u, {}).items():
+            nueva = d + w
+            if nueva < distancias.get(v, math.inf):
+                distancias[v] = nueva
+                predecesores[v] = u
+                heapq.heappush(cola, (nueva, v))
+    return distancias, predecesores
+
+
+class JerarquiaContraccion:
+    """Jerarquía de contracción para consultas repetidas de camino más corto.
+
+    El preprocesamiento contrae los nodos de menos a más importantes y añade
+    atajos que preservan las distancias; cada consulta es un Dijkstra
+    bidireccional que solo sube de rango. La red se trata como no dirigida,
+    igual que ``distancias`` en GrafoTurismo.
+    """
+    def __init__(self, nombres, rango, desplazamientos, destinos, pesos, medios):
+        self.nombres = list(nombres)
+        self.indices = {nombre: i for i, nombre in enumerate(self.nombres)}
+        self.rango = np.asarray(rango)
+        # Grafo ascendente en CSR; medios[k] es el nodo puenteado por el atajo k (-1 si es arista original)
+        self.desplazamientos = np.asarray(desplazamientos)
+        self.destinos = np.asarray(destinos)
+        self.pesos = np.asarray(pesos)
+        self.medios = np.asarray(medios)
+        self._desp = self.desplazamientos.tolist()
+        self._dest = self.destinos.tolist()
+        self._peso = self.pesos.tolist()
+        self._medio = {}  # (menor, mayor) → nodo puenteado, para desempacar atajos
+        for u in range(len(self.nombres)):
+            for k in range(self._desp[u], self._desp[u + 1]):
+                if self.medios[k] >= 0:
+                    v = self._dest[k]
+                    self._medio[(min(u, v), max(u, v))] = int(self.medios[k])
+
+    ## Preprocesamiento ##
+
+    @classmethod
+    def construir(cls, red, limite_testigo: int = 64):
+        """Construye la jerarquía a partir de ``{origen: {destino: distancia}}`` o de un ``GrafoCSR``.
+
+        ``limite_testigo`` acota los nodos asentados en cada búsqueda de testigos;
+        un límite bajo acelera el preprocesamiento a cambio de algunos atajos de más.
+        """
+        if isinstance(red, GrafoCSR):
+            nombres = [red.nombre(i) for i in range(len(red))]
+            adyacencia = [dict() for _ in nombres]
+            for u in range(len(nombres)):
+                for k in range(red._mv_desplazamientos[u], red._mv_desplazamientos[u + 1]):
+                    v, w = red._mv_destinos[k], red._mv_pesos[k]
+                    if v != u and w < adyacencia[u].get(v, (math.inf,))[0]:
+                        adyacencia[u][v] = (w, -1)
+                        adyacencia[v][u] = (w, -1)
+        else:
+            todos = set(red)
+            for vecinos in red.values():
+                todos.update(vecinos)
+            nombres = sorted(todos)
+            indices = {nombre: i for i, nombre in enumerate(nombres)}
+            adyacencia = [dict() for _ in nombres]
+            for origen, vecinos in red.items():
+                u = indices[origen]
+                for destino, w in vecinos.items():
+                    v = indices[destino]
+                    if v != u and w < adyacencia[u].get(v, (math.inf,))[0]:
+                        adyacencia[u][v] = (w, -1)
+                        adyacencia[v][u] = (w, -1)
+
+        n = len(nombres)
+        contraidos_vecinos = [0] * n
+        rango = [-1] * n
+
+        def atajos_necesarios(v):
+            """Atajos ``(u, x, peso)`` que hacen falta si se contrae ``v``."""
+            vecinos = list(adyacencia[v].items())
+            atajos = []
+            for i, (u, (wu, _)) in enumerate(vecinos):
+                objetivos = {x: wu + wx for x, (wx, _) in vecinos[i + 1:]}
+                if not objetivos:
+                    continue
+                limite = max(objetivos.values())
+                # Búsqueda de testigos desde u sin pasar por v
+                dist = {u: 0.0}
+                cola = [(0.0, u)]
+                asentados = 0
+                while cola and asentados < limite_testigo:
+                    d, y = heapq.heappop(cola)
+                    if d > dist.get(y, math.inf) or d > limite:
+                        if d > limite:
+                            break
+                        continue
+                    asentados += 1
+                    for z, (wz, _) in adyacencia[y].items():
+                        if z != v and d + wz < dist.get(z, math.inf):
+                            dist[z] = d + wz
+                            heapq.heappush(cola, (d + wz, z))
+                for x, peso in objetivos.items():
+                    if dist.get(x, math.inf) > peso:
+                        atajos.append((u, x, peso))
+            return atajos
+
+        def prioridad(v):
+            return len(atajos_necesarios(v)) - len(adyacencia[v]) + contraidos_vecinos[v]
+
+        cola = [(prioridad(v), v) for v in range(n)]
+        heapq.heapify(cola)
+        ascendente = [None] * n
+        siguiente_rango = 0
+        while cola:
+            _, v = heapq.heappop(cola)
+            if rango[v] != -1:
+                continue
+            # Actualización perezosa: si la prioridad empeoró, se reencola
+            actual = prioridad(v)
+            if cola and actual > cola[0][0]:
+                heapq.heappush(cola, (actual, v))
+                continue
+            for u, x, peso in atajos_necesarios(v):
+                if peso < adyacencia[u].get(x, (math.inf,))[0]:
+                    adyacencia[u][x] = (peso, v)
+                    adyacencia[x][u] = (peso, v)
+            rango[v] = siguiente_rango
+            siguiente_rango += 1
+            ascendente[v] = adyacencia[v]
+            for u in adyacencia[v]:
+                del adyacencia[u][v]
+                contraidos_vecinos[u] += 1
+            adyacencia[v] = {}
+
+        desplazamientos, destinos, pesos, medios = [0], [], [], []
+        for v in range(n):
+            for u, (peso, medio) in sorted(ascendente[v].items()):
+                destinos.append(u)
+                pesos.append(peso)
+                medios.append(medio)
+            desplazamientos.append(len(destinos))
+        return cls(nombres, np.array(rango, dtype=np.int32), np.array(desplazamientos, dtype=np.int64),
+                   np.array(destinos, dtype=np.int32), np.array(pesos, dtype=np.float64),
+                   np.array(medios, dtype=np.int32))
+
+    def guardar(self, ruta: str):
+        """Guarda la jerarquía en un archivo ``.npz``."""
+        np.savez(ruta, nombres=np.array(self.nombres, dtype=str), rango=self.rango,
+                 desplazamientos=self.desplazamientos, destinos=self.destinos,
+                 pesos=self.pesos, medios=self.medios)
+
+    @classmethod
+    def cargar(cls, ruta: str):
+        """Carga una jerarquía guardada con ``guardar``."""
+        with np.load(ruta) as datos:
+            return cls(datos["nombres"].tolist(), datos["rango"], datos["desplazamientos"],
+                       datos["destinos"], datos["pesos"], datos["medios"])
+
+    ## Consultas ##
+
+    def _ascender(self, origen: int):
+        """Dijkstra completo en el grafo ascendente desde ``origen``; devuelve {nodo: distancia}."""
+        desp, dest, peso = self._desp, self._dest, self._peso
+        dist = {origen: 0.0}
+        cola = [(0.0, origen)]
+        while cola:
+            d, u = heapq.heappop(cola)
+            if d > dist[u]:
+                continue
+            for k in range(desp[u], desp[u + 1]):
+                v, nueva = dest[k], d + peso[k]
+                if nueva < dist.get(v, math.inf):
+                    dist[v] = nueva
+                    heapq.heappush(cola, (nueva, v))
+        return dist
+
+    def _consultar(self, s: int, t: int):
+        """Dijkstra bidireccional ascendente; devuelve (distancia, nodo de encuentro, padres_f, padres_b)."""
+        desp, dest, peso = self._desp, self._dest, self._peso
+        dist = ({s: 0.0}, {t: 0.0})
+        padres = ({s: None}, {t: None})
+        colas = ([(0.0, s)], [(0.0, t)])
+        mejor, encuentro = (0.0, s) if s == t else (math.inf, -1)
+        lado = 0
+        while colas[0] or colas[1]:
+            if not colas[lado] or (colas[1 - lado] and colas[1 - lado][0][0] < colas[lado][0][0]):
+                lado = 1 - lado
+            d, u = heapq.heappop(colas[lado])
+            if d >= mejor:
+                colas[lado].clear()  # Esta dirección ya no puede mejorar el resultado
+                continue
+            if d > dist[lado][u]:
+                continue
+            otra = dist[1 - lado].get(u)
+            if otra is not None and d + otra < mejor:
+                mejor, encuentro = d + otra, u
+            for k in range(desp[u], desp[u + 1]):
+                v, nueva = dest[k], d + peso[k]
+                if nueva < dist[lado].get(v, math.inf):
+                    dist[lado][v] = nueva
+                    padres[lado][v] = u
+                    heapq.heappush(colas[lado], (nueva, v))
+        return mejor, encuentro, padres[0], padres[1]
+
+    def _desempacar(self, u: int, v: int, ruta):
+        """Agrega a ``ruta`` la arista original o el atajo (u, v) ya desempacado, sin incluir u."""
+        pila = [(u, v)]
+        while pila:
+            a, b = pila.pop()
+            medio = self._medio.get((min(a, b), max(a, b)), -1)
+            if medio == -1:
+                ruta.append(b)
+            else:
+                pila.append((medio, b))
+                pila.append((a, medio))
+
+    def distancia(self, origen: str, destino: str) -> float:
+        """Distancia más corta entre dos ubicaciones (infinito si no hay camino)."""
+        return self._consultar(self.indices[origen], self.indices[destino])[0]
+
+    def ruta(self, origen: str, destino: str):
+        """Camino más corto desempacado; devuelve (ruta, distancia) o (None, infinito)."""
+        s, t = self.indices[origen], self.indices[destino]
+        mejor, encuentro, padres_f, padres_b = self._consultar(s, t)
+        if encuentro == -1:
+            return None, math.inf
+        subida = [encuentro]
+        while padres_f[subida[-1]] is not None:
+            subida.append(padres_f[subida[-1]])
+        subida.reverse()
+        bajada = [encuentro]
+        while padres_b[bajada[-1]] is not None:
+            bajada.append(padres_b[bajada[-1]])
+
+        ruta = [s]
+        for a, b in zip(subida, subida[1:]):
+            self._desempacar(a, b, ruta)
+        for a, b in zip(bajada, bajada[1:]):
+            # El tramo de bajada se recorre al revés; el atajo es simétrico
+            tramo = []
+            self._desempacar(b, a, tramo)
+            ruta.extend(reversed([b] + tramo[:-1]))
+        return [self.nombres[i] for i in ruta], mejor
+
+    def matriz(self, origenes, destinos=None):
+        """Matriz de distancias muchos-a-muchos con cubetas (una búsqueda ascendente por nodo)."""
+        destinos = origenes if destinos is None else destinos
+        cubetas = defaultdict(list)
+        for j, nombre in enumerate(destinos):
+            for v, d in self._ascender(self.indices[nombre]).items():
+                cubetas[v].append((j, d))
+        resultado = np.full((len(origenes), len(destinos)), np.inf)
+        for i, nombre in enumerate(origenes):
+            fila = resultado[i]
+            for v, d in self._ascender(self.indices[nombre]).items():
+                for j, dj in cubetas.get(v, ()):
+                    if d + dj < fila[j]:
+                        fila[j] = d + dj
+        return resultado
+
+
+class RedDinamica:
+    """Red con pesos cambiantes que mantiene caminos más cortos e itinerarios al día.
+
+    Guarda un árbol de caminos más cortos (distancias, predecesores e hijos)
+    por cada origen de interés. ``actualizar_pesos`` recibe un lote de
+    cambios y repara solo lo afectado: un aumento solo invalida el subárbol
+    que colgaba de una arista del árbol, y una disminución solo propaga desde
+    la arista que mejora. Los orígenes que no usan ninguna arista modificada
+    no se tocan.
+
+    Los itinerarios registrados (recorridos cerrados sobre distancias de
+    camino más corto) se revisan solo si cambió la distancia entre dos de sus
+    paradas.
+    """
+    def __init__(self, adyacencia):
+        self.adyacencia = defaultdict(dict, {origen: dict(vecinos) for origen, vecinos in adyacencia.items()})
+        self._arboles = {}  # origen → (distancias, predecesores, hijos)
+        self._itinerarios = {}  # clave → (paradas, costo)
+        self._itinerarios_por_parada = defaultdict(set)
+
+    def _arbol(self, origen):
+        if origen not in self._arboles:
+            distancias, predecesores = dijkstra(self.adyacencia, origen)
+            hijos = defaultdict(set)
+            for nodo, padre in predecesores.items():
+                if padre is not None:
+                    hijos[padre].add(nodo)
+            self._arboles[origen] = (distancias, predecesores, hijos)
+        return self._arboles[origen]
+
+    def distancia(self, origen: str, destino: str) -> float:
+        return self._arbol(origen)[0].get(destino, math.inf)
+
+    def ruta(self, origen: str, destino: str):
+        """Camino más corto como lista de nombres, o None si no hay conexión."""
+        distancias, predecesores, _ = self._arbol(origen)
+        if destino not in distancias:
+            return None
+        ruta = [destino]
+        while ruta[-1] != origen:
+            ruta.append(predecesores[ruta[-1]])
+        return ruta[::-1]
+
+    def _matriz_paradas(self, paradas):
+        return np.array([[self.distancia(a, b) for b in paradas] for a in paradas])
+
+    def registrar_itinerario(self, clave, paradas):
+        """Guarda un recorrido cerrado (``paradas[0] == paradas[-1]``) y devuelve su costo actual."""
+        paradas = list(paradas)
+        if len(paradas) < 3 or paradas[0] != paradas[-1]:
+            raise ValueError(f"El itinerario '{clave}' debe ser un recorrido cerrado de al menos dos paradas")
+        costo = sum(self.distancia(a, b) for a, b in zip(paradas, paradas[1:]))
+        self.eliminar_itinerario(clave)
+        self._itinerarios[clave] = (paradas, costo)
+        for parada in set(paradas):
+            self._itinerarios_por_parada[parada].add(clave)
+        return costo
+
+    def eliminar_itinerario(self, clave):
+        paradas, _ = self._itinerarios.pop(clave, ((), None))
+        for parada in set(paradas):
+            self._itinerarios_por_parada[parada].discard(clave)
+
+    def _reparar(self, origen, cambios):
+        """Repara el árbol de ``origen`` tras aplicar ``cambios``; devuelve los nodos cuya distancia cambió."""
+        distancias, predecesores, hijos = self._arboles[origen]
+        anteriores = {}
+
+        def asignar(nodo, distancia, padre):
+            if nodo not in anteriores:
+                anteriores[nodo] = distancias.get(nodo, math.inf)
+            viejo = predecesores.get(nodo)
+            if viejo is not None:
+                hijos[viejo].discard(nodo)
+            distancias[nodo] = distancia
+            predecesores[nodo] = padre
+            hijos[padre].add(nodo)
+
+        # Los aumentos solo afectan a los subárboles que colgaban de la arista
+        afectados = set()
+        for u, v, viejo, nuevo in cambios:
+            if nuevo > viejo:
+                for padre, hijo in ((u, v), (v, u)):
+                    if predecesores.get(hijo) == padre and hijo not in afectados:
+                        pila = [hijo]
+                        while pila:
+                            nodo = pila.pop()
+                            afectados.add(nodo)
+                            pila.extend(h for h in hijos.get(nodo, ()) if h not in afectados)
+        for nodo in afectados:
+            anteriores[nodo] = distancias.pop(nodo)
+            hijos[predecesores.pop(nodo)].discard(nodo)
+            hijos.pop(nodo, None)
+
+        cola = []
+        for nodo in afectados:
+            mejor, padre = math.inf, None
+            for vecino, peso in self.adyacencia.get(nodo, {}).items():
+                if vecino not in afectados and vecino in distancias and distancias[vecino] + peso < mejor:
+                    mejor, padre = distancias[vecino] + peso, vecino
+            if padre is not None:
+                asignar(nodo, mejor, padre)
+                cola.append((mejor, nodo))
+        for u, v, viejo, nuevo in cambios:
+            if nuevo < viejo:
+                for a, b in ((u, v), (v, u)):
+                    if a in distancias and distancias[a] + nuevo < distancias.get(b, math.inf):
+                        asignar(b, distancias[a] + nuevo, a)
+                        cola.append((distancias[b], b))
+
+        heapq.heapify(cola)
+        while cola:
+            d, u = heapq.heappop(cola)
+            if d > distancias.get(u, math.inf):
+                continue
+            for v, w in self.adyacencia.get(u, {}).items():
+                if d + w < distancias.get(v, math.inf):
+                    asignar(v, d + w, u)
+                    heapq.heappush(cola, (d + w, v))
+        return {nodo for nodo, d in anteriores.items() if distancias.get(nodo, math.inf) != d}
+
+    def actualizar_pesos(self, cambios):
+        """Aplica un lote ``{(origen, destino): peso}`` (``math.inf`` cierra la calle) y repara lo afectado.
+
+        Returns:
+            dict: ``origenes`` reparados, itinerarios ``obsoletos`` ({clave: costo nuevo} del mismo
+            orden de paradas) y ``suboptimos`` ({clave: (paradas, costo)} con un orden mejor encontrado).
+        """
+        finales = {}  # Un solo cambio por calle: gana el último del lote en cualquier sentido
+        for (u, v), peso in cambios.items():
+            finales.pop((v, u), None)
+            finales[(u, v)] = peso
+        aplicados = []
+        for (u, v), peso in finales.items():
+            viejo = self.adyacencia.get(u, {}).get(v, math.inf)
+            if peso == viejo:
+                continue
+            for a, b in ((u, v), (v, u)):
+                if peso == math.inf:
+                    self.adyacencia[a].pop(b, None)
+                else:
+                    self.adyacencia[a][b] = peso
+            aplicados.append((u, v, viejo, peso))
+
+        reparados = []
+        revisar = set()
+        for origen in self._arboles:
+            cambiados = self._reparar(origen, aplicados)
+            if cambiados:
+                reparados.append(origen)
+                for clave in self._itinerarios_por_parada.get(origen, ()):
+                    if cambiados.intersection(self._itinerarios[clave][0]):
+                        revisar.add(clave)
+
+        obsoletos, suboptimos = {}, {}
+        for clave in revisar:
+            paradas, costo = self._itinerarios[clave]
+            nuevo = sum(self.distancia(a, b) for a, b in zip(paradas, paradas[1:]))
+            if nuevo != costo:
+                obsoletos[clave] = nuevo
+                self._itinerarios[clave] = (paradas, nuevo)
+            unicas = paradas[:-1]
+            tour, mejor = _resolver_tour(self._matriz_paradas(unicas))
+            if mejor < nuevo - 1e-9:
+                suboptimos[clave] = ([unicas[i] for i in tour], mejor)
+        return {"origenes": reparados, "obsoletos": obsoletos, "suboptimos": suboptimos}
+
+
+_RED_SERVICIO = None
+_UBICACIONES_SERVICIO = None
+
+
+def _iniciar_servicio(red):
+    """Carga la red del servicio una vez por proceso (pares predefinidos o ruta a un archivo CSR)."""
+    global _RED_SERVICIO, _UBICACIONES_SERVICIO
+    if isinstance(red, str):
+        red = GrafoCSR(red)
+    elif not isinstance(red, GrafoCSR):
+        red = GrafoBase(red)
+    _RED_SERVICIO = red
+    _UBICACIONES_SERVICIO = red if isinstance(red, GrafoCSR) else red.adyacencia
+
+
+def _resolver_ruta(destinos):
+    """Calcula la ruta óptima para un conjunto de destinos sobre la red del servicio."""
+    desconocidos = [d for d in destinos if d not in _UBICACIONES_SERVICIO]
+    if desconocidos:
+        return {"error": f"Ubicaciones desconocidas: {', '.join(desconocidos)}"}
+    if isinstance(_RED_SERVICIO, GrafoCSR):
+        grafo = GrafoTurismo()
+    else:
+        grafo = SesionTurismo(_RED_SERVICIO)
+    for destino in destinos:
+        if destino == "Macroplaza":
+            continue
+        resultado = grafo.agregar_ubicacion(destino)
+        if "Error" in resultado:
+            return {"error": resultado}
+    grafo.conectar_ubicaciones_densamente(_RED_SERVICIO if isinstance(_RED_SERVICIO, GrafoCSR) else None)
+    ruta, distancia = grafo.calcular_ruta_optima()
+    if ruta is None:
+        return {"error": distancia}
+    return {"ruta": ruta, "distancia": distancia}
+
+
+class ServicioRutas:
+    """Servicio HTTP/JSON (asyncio, solo biblioteca estándar) para calcular rutas óptimas.
+
+    ``POST /ruta`` con ``{"destinos": [...]}`` devuelve la ruta y su distancia;
+    ``GET /estadisticas`` devuelve latencias p50/p99 y contadores. Los cálculos
+    se hacen en un ejecutor; las solicitudes idénticas en curso comparten un solo
+    cálculo y, si la cola de cálculos pendientes está llena, se responde 503.
+    Los cuerpos de más de ``max_cuerpo`` bytes se rechazan con 413 sin leerlos.
+
+    Sin ``ejecutor`` se crea un ProcessPoolExecutor que carga la red en cada
+    proceso; un ``ejecutor`` propio debe ser de hilos, porque sus procesos no
+    tendrían la red cargada.
+    """
+    def __init__(self, red=DISTANCIAS_PREDEFINIDAS, host: str = "127.0.0.1", puerto: int = 8080,
+                 max_pendientes: int = 1024, ejecutor=None, trabajadores=None, max_cuerpo: int = 64 * 1024):
+        self.red = red
+        self.host = host
+        self.puerto = puerto
+        if isinstance(ejecutor, ProcessPoolExecutor):
+            raise TypeError("Use un ejecutor de hilos; con ejecutor=None el servicio crea su propio "
+                            "ProcessPoolExecutor con la red cargada en cada proceso")
+        self.trabajadores = trabajadores or os.cpu_count() or 1
+        self._ejecutor_propio = ejecutor is None
+        self.ejecutor = ejecutor
+        self._max_pendientes = max_pendientes
+        self._max_cuerpo = max_cuerpo
+        self._cola = None
+        self._en_curso = {}
+        self._tareas = []
+        self._conexiones = {}  # escritor → tarea que atiende la conexión
+        self._servidor = None
+        self.latencias = deque(maxlen=100_000)  # segundos por solicitud de ruta
+        self.contadores = {"solicitudes": 0, "calculos": 0, "coalescidas": 0, "rechazadas": 0}
+
+    async def iniciar(self):
+        """Inicia el ejecutor, los trabajadores y el socket; devuelve el servicio."""
+        if self.ejecutor is None:
+            self.ejecutor = ProcessPoolExecutor(max_workers=self.trabajadores,
+                                                initializer=_iniciar_servicio, initargs=(self.red,))
+        else:
+            _iniciar_servicio(self.red)  # Ejecutores de hilos comparten la red de este proceso
+        self._cola = asyncio.Queue(maxsize=self._max_pendientes)
+        self._tareas = [asyncio.create_task(self._trabajador()) for _ in range(self.trabajadores)]
+        self._servidor = await asyncio.start_server(self._atender, self.host, self.puerto, backlog=4096)
+        self.puerto = self._servidor.sockets[0].getsockname()[1]
+        return self
+
+    async def cerrar(self):
+        self._servidor.close()
+        for escritor in list(self._conexiones):
+            escritor.close()
+        await asyncio.gather(*self._conexiones.values(), return_exceptions=True)
+        await self._servidor.wait_closed()
+        for tarea in self._tareas:
+            tarea.cancel()
+        await asyncio.gather(*self._tareas, return_exceptions=True)
+        if self._ejecutor_propio:
+            self.ejecutor.shutdown()
+            self.ejecutor = None
+
+    def ejecutar(self):
+        """Atiende solicitudes hasta que se interrumpa el proceso."""
+        async def principal():
+            await self.iniciar()
+            print(f"Servicio de rutas en http://{self.host}:{self.puerto}")
+            try:
+                await self._servidor.serve_forever()
+            finally:
+                await self.cerrar()
+        try:
+            asyncio.run(principal())
+        except KeyboardInterrupt:
+            pass
+
+    async def resolver(self, destinos):
+        """Devuelve el resultado para ``destinos``, compartiendo cálculos idénticos en curso.
+
+        Lanza ``asyncio.QueueFull`` si hay demasiados cálculos pendientes.
+        """
+        clave = tuple(sorted(set(destinos)))
+        futuro = self._en_curso.get(clave)
+        if futuro is None:
+            futuro = asyncio.get_running_loop().create_future()
+            self._cola.put_nowait((clave, futuro))
+            self._en_curso[clave] = futuro
+            futuro.add_done_callback(lambda _: self._en_curso.pop(clave, None))
+        else:
+            self.contadores["coalescidas"] += 1
+        return await asyncio.shield(futuro)
+
+    async def _trabajador(self):
+        bucle = asyncio.get_running_loop()
+        while True:
+            clave, futuro = await self._cola.get()
+            try:
+                resultado = await bucle.run_in_executor(self.ejecutor, _resolver_ruta, clave)
+                self.contadores["calculos"] += 1
+                futuro.set_result(resultado)
+            except Exception as error:
+                futuro.set_exception(error)
+            finally:
+                self._cola.task_done()
+
+    def estadisticas(self):
+        """Latencias p50/p99 (ms) de las solicitudes de ruta y contadores del servicio."""
+        latencias = sorted(self.latencias)
+        def percentil(p):
+            return round(latencias[min(len(latencias) - 1, int(p * len(latencias)))] * 1000, 3) if latencias else None
+        return {"p50_ms": percentil(0.50), "p99_ms": percentil(0.99),
+                "pendientes": self._cola.qsize() if self._cola else 0, **self.contadores}
+
+    async def _despachar(self, metodo: str, ruta: str, cuerpo: bytes):
+        if metodo == "GET" and ruta == "/estadisticas":
+            return HTTPStatus.OK, self.estadisticas()
+        if ruta != "/ruta":
+            return HTTPStatus.NOT_FOUND, {"error": f"Ruta '{ruta}' no encontrada"}
+        if metodo != "POST":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Use POST"}
+
+        inicio = time.perf_counter()
+        self.contadores["solicitudes"] += 1
+        try:
+            destinos = json.loads(cuerpo)["destinos"]
+            if not isinstance(destinos, list) or not all(isinstance(d, str) for d in destinos):
+                raise ValueError
+        except (ValueError, KeyError, TypeError):
+            return HTTPStatus.BAD_REQUEST, {"error": 'Se espera {"destinos": ["...", ...]}'}
+        try:
+            resultado = await self.resolver(destinos)
+        except asyncio.QueueFull:
+            self.contadores["rechazadas"] += 1
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": "Servicio saturado, intente de nuevo"}
+        self.latencias.append(time.perf_counter() - inicio)
+        if "error" in resultado:
+            return HTTPStatus.BAD_REQUEST, resultado
+        return HTTPStatus.OK, resultado
+
+    async def _atender(self, lector, escritor):
+        """Atiende una conexión HTTP/1.1 (con keep-alive) hasta que el cliente la cierre."""
+        self._conexiones[escritor] = asyncio.current_task()
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                metodo, ruta, _ = linea.decode("latin-1").split(" ", 2)
+                cabeceras = {}
+                while True:
+                    linea = await lector.readline()
+                    if linea in (b"\r\n", b"\n", b""):
+                        break
+                    nombre, _, valor = linea.decode("latin-1").partition(":")
+                    cabeceras[nombre.strip().lower()] = valor.strip()
+                longitud = cabeceras.get("content-length", "0")
+                cerrar = cabeceras.get("connection", "").lower() == "close"
+                if not longitud.isdecimal():
+                    # El cuerpo no se lee, así que la conexión no se puede reutilizar
+                    estado, respuesta = HTTPStatus.BAD_REQUEST, {"error": "Content-Length inválido"}
+                    cerrar = True
+                elif int(longitud) > self._max_cuerpo:
+                    estado = HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+                    respuesta = {"error": f"El cuerpo excede {self._max_cuerpo} bytes"}
+                    cerrar = True
+                else:
+                    cuerpo = await lector.readexactly(int(longitud))
+                    estado, respuesta = await self._despachar(metodo, ruta, cuerpo)
+
+                datos = json.dumps(respuesta, ensure_ascii=False).encode("utf-8")
+                escritor.write((f"HTTP/1.1 {estado.value} {estado.phrase}\r\n"
+                                f"Content-Type: application/json; charset=utf-8\r\n"
+                                + ("Connection: close\r\n" if cerrar else "")
+                                + f"Content-Length: {len(datos)}\r\n\r\n").encode("latin-1") + datos)
+                await escritor.drain()
+                if cerrar:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self._conexiones.pop(escritor, None)
+            escritor.close()
+
+
+async def consultar_servicio(lector, escritor, destinos):
+    """Cliente mínimo: envía una solicitud de ruta por una conexión abierta y devuelve (estado, json)."""
+    cuerpo = json.dumps({"destinos": destinos}).encode("utf-8")
+    escritor.write(b"POST /ruta HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                   + f"Content-Length: {len(cuerpo)}\r\n\r\n".encode("latin-1") + cuerpo)
+    await escritor.drain()
+    estado = int((await lector.readline()).split()[1])
+    longitud = 0
+    while True:
+        linea = await lector.readline()
+        if linea in (b"\r\n", b""):
+            break
+        if linea.lower().startswith(b"content-length:"):
+            longitud = int(linea.split(b":")[1])
+    return estado, json.loads(await lector.readexactly(longitud))
+
+
+class FiltroUbicaciones:
+    """Catálogo de ubicaciones con filtrado incremental sobre nombres normalizados.
+
+    Los nombres se normalizan una sola vez. Cada palabra de la consulta debe
+    aparecer como subcadena del nombre. Mientras el usuario escribe, la
+    consulta nueva extiende a la anterior y solo se revisan los resultados
+    previos; al borrar se retoma el resultado guardado del prefijo.
+    """
+    def __init__(self, nombres):
+        self.nombres = list(nombres)
+        self._normalizados = [normalizar_nombre(nombre) for nombre in self.nombres]
+        self._posicion = {nombre: i for i, nombre in enumerate(self.nombres)}
+        self._ocultos = set()  # Índices no disponibles (por ejemplo, ya seleccionados)
+        self._historial = [("", range(len(self.nombres)))]  # (consulta, índices) de cada prefijo escrito
+        self._indice = None  # IndiceNombres para sugerencias, se construye con la primera
+
+    def __len__(self):
+        return len(self.nombres) - len(self._ocultos)
+
+    def ocultar(self, nombre: str):
+        self._ocultos.add(self._posicion[nombre])
+
+    def mostrar(self, nombre: str):
+        self._ocultos.discard(self._posicion[nombre])
+
+    def filtrar(self, texto: str):
+        """Nombres disponibles que contienen todas las palabras de ``texto``, en el orden del catálogo."""
+        consulta = normalizar_nombre(texto)
+        while not consulta.startswith(self._historial[-1][0]):
+            self._historial.pop()
+        previa, indices = self._historial[-1]
+        if consulta != previa:
+            normalizados = self._normalizados
+            for palabra in consulta.split():
+                indices = [i for i in indices if palabra in normalizados[i]]
+            self._historial.append((consulta, indices))
+        ocultos, nombres = self._ocultos, self.nombres
+        return [nombres[i] for i in indices if i not in ocultos]
+
+    def sugerencias(self, texto: str, limite: int = 3):
+        """Nombres disponibles parecidos a ``texto`` cuando el filtro no encuentra nada."""
+        if self._indice is None:
+            self._indice = IndiceNombres(self.nombres)
+        encontrados = self._indice.buscar_aproximado(texto, limite=limite + len(self._ocultos))
+        return [nombre for nombre, _ in encontrados if self._posicion[nombre] not in self._ocultos][:limite]
+
+
+class ListaVirtual(ttk.Frame):
+    """Lista con barra de desplazamiento que solo dibuja las filas visibles.
+
+    ``elementos`` puede tener cientos de miles de entradas: el ``Listbox``
+    interno contiene únicamente la ventana visible y se vuelve a llenar al
+    desplazarse. La selección se guarda por nombre, así que sobrevive a
+    desplazamientos y filtros, junto con su posición en ``elementos`` para que
+    moverla o quitarla no tenga que buscarla.
+    """
+    def __init__(self, padre, **opciones):
+        super().__init__(padre)
+        self.elementos = []
+        self.inicio = 0
+        self.seleccionado = None
+        self.indice = None  # Posición de ``seleccionado`` en ``elementos`` (None si no está)
+        self.lista = tk.Listbox(self, selectmode=tk.SINGLE, exportselection=False, **opciones)
+        self.barra = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._desplazar)
+        self.barra.pack(side=tk.RIGHT, fill=tk.Y)
+        self.lista.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self._alto_fila = tkfont.Font(font=self.lista.cget("font")).metrics("linespace") + 1
+
+        self.lista.bind("<<ListboxSelect>>", self._al_seleccionar)
+        self.lista.bind("<Configure>", lambda evento: self._dibujar())
+        self.lista.bind("<MouseWheel>", lambda evento: self._rueda(-evento.delta // 120 * 3))
+        self.lista.bind("<Button-4>", lambda evento: self._rueda(-3))
+        self.lista.bind("<Button-5>", lambda evento: self._rueda(3))
+        self.lista.bind("<Up>", lambda evento: self._mover(-1))
+        self.lista.bind("<Down>", lambda evento: self._mover(1))
+
+    def _filas_visibles(self) -> int:
+        alto = self.lista.winfo_height()
+        if alto <= 1:  # Todavía no se ha dibujado
+            return int(self.lista.cget("height"))
+        return alto // self._alto_fila + 1
+
+    def _dibujar(self):
+        filas = self._filas_visibles()
+        total = len(self.elementos)
+        self.inicio = max(0, min(self.inicio, total - filas))
+        visibles = self.elementos[self.inicio:self.inicio + filas]
+        self.lista.delete(0, tk.END)
+        if visibles:
+            self.lista.insert(0, *visibles)
+        if self.indice is not None and self.inicio <= self.indice < self.inicio + len(visibles):
+            self.lista.selection_set(self.indice - self.inicio)
+        if total:
+            self.barra.set(self.inicio / total, min(1.0, (self.inicio + filas) / total))
+        else:
+            self.barra.set(0.0, 1.0)
+
+    def _desplazar(self, accion, cantidad, unidad=None):
+        if accion == "moveto":
+            self.inicio = int(float(cantidad) * len(self.elementos))
+        else:
+            paso = self._filas_visibles() if unidad == "pages" else 1
+            self.inicio += int(cantidad) * paso
+        self._dibujar()
+
+    def _rueda(self, filas: int):
+        """Desplaza con la rueda del ratón sin que el ``Listbox`` también se desplace por su cuenta."""
+        self._desplazar("scroll", filas, "units")
+        return "break"
+
+    def _al_seleccionar(self, evento):
+        seleccion = self.lista.curselection()
+        if seleccion:
+            self.indice = self.inicio + seleccion[0]
+            self.seleccionado = self.elementos[self.indice]
+
+    def _mover(self, paso: int):
+        """Mueve la selección con el teclado y desplaza la ventana si sale de la vista."""
+        if not self.elementos:
+            return "break"
+        actual = self.indice if self.indice is not None else self.inicio - paso
+        nuevo = max(0, min(len(self.elementos) - 1, actual + paso))
+        self.indice = nuevo
+        self.seleccionado = self.elementos[nuevo]
+        filas = self._filas_visibles() - 1
+        if nuevo < self.inicio:
+            self.inicio = nuevo
+        elif nuevo >= self.inicio + filas:
+            self.inicio = nuevo - filas + 1
+        self._dibujar()
+        return "break"
+
+    def establecer(self, elementos):
+        """Reemplaza el contenido (por ejemplo, con el resultado de un filtro) y vuelve al principio."""
+        self.elementos = elementos
+        self.inicio = 0
+        # Una sola búsqueda por filtro (que ya recorre el catálogo) para ubicar la selección
+        self.indice = next((i for i, elemento in enumerate(elementos) if elemento == self.seleccionado), None)
+        self._dibujar()
+
+    def quitar(self, elemento):
+        if elemento == self.seleccionado and self.indice is not None:
+            del self.elementos[self.indice]
+            self.seleccionado = self.indice = None
+        else:
+            posicion = self.elementos.index(elemento)
+            del self.elementos[posicion]
+            if self.indice is not None and posicion < self.indice:
+                self.indice -= 1
+        self._dibujar()
+
+    def seleccion(self):
+        """Elemento seleccionado si sigue en la lista, o None."""
+        return self.seleccionado if self.indice is not None else None
+
+
 class InterfazTurismo(tk.Tk):
-    def __init__(self):
+    def __init__(self, catalogo=None):
         super().__init__()
         self.grafo = GrafoTurismo()
         self.title("Monterrey Tours Express - Rutas Turísticas Inteligentes")
         self.geometry("800x600")
         
-        self.distancias_predefinidas = {
-            # Conexiones con Macroplaza (distancias reales aproximadas)
-            ("Macroplaza", "Parque Fundidora"): 1.8,
-            ("Macroplaza", "Museo del Acero"): 2.1,
-            ("Macroplaza", "Barrio Antiguo"): 0.8,
-            ("Macroplaza", "Catedral de Monterrey"): 0.3,
-            ("Macroplaza", "Cerro del Obispado"): 3.2,
-            ("Macroplaza", "Estadio BBVA"): 6.8,
-            ("Macroplaza", "Paseo Santa Lucía"): 0.5,
-            ("Macroplaza", "Museo de Historia Mexicana"): 0.4,
-            
-            # Conexiones entre ubicaciones (distancias reales aproximadas)
-            ("Parque Fundidora", "Museo del Acero"): 1.2,
-            ("Parque Fundidora", "Paseo Santa Lucía"): 2.5,  
-            ("Parque Fundidora", "Estadio BBVA"): 8.0,
-            ("Museo del Acero", "Estadio BBVA"): 7.2,
-            ("Museo del Acero", "Cerro del Obispado"): 4.1,
-            ("Barrio Antiguo", "Cerro del Obispado"): 2.9,
-            ("Barrio Antiguo", "Museo de Historia Mexicana"): 1.2,
-            ("Catedral de Monterrey", "Museo de Historia Mexicana"): 0.6,
-            ("Catedral de Monterrey", "Paseo Santa Lucía"): 0.7,
-            ("Cerro del Obispado", "Estadio BBVA"): 5.4,
-            ("Paseo Santa Lucía", "Museo de Historia Mexicana"): 0.8,
-            ("Estadio BBVA", "Parque Fundidora"): 8.0
-        }
+        self.distancias_predefinidas = DISTANCIAS_PREDEFINIDAS
+        if catalogo is None:
+            catalogo = [
+                "Parque Fundidora", "Museo del Acero", "Barrio Antiguo",
+                "Catedral de Monterrey", "Cerro del Obispado", "Estadio BBVA",
+                "Paseo Santa Lucía", "Museo de Historia Mexicana"
+            ]
+        self.filtro = FiltroUbicaciones(catalogo)
+        self._filtro_pendiente = None  # after() del filtro con retardo
+        self._estado_pendiente = None  # after() que borra el mensaje de estado
         
         self._configurar_interfaz()
     
@@ -183,16 +2104,13 @@ class InterfazTurismo(tk.Tk):
         frame_disponibles = ttk.LabelFrame(self.frame, text="Ubicaciones Disponibles")
         frame_disponibles.grid(row=2, column=0, padx=10, pady=10, sticky="nsew")
         
-        self.lista_disponibles = tk.Listbox(frame_disponibles, width=25, height=10, selectmode=tk.SINGLE)
-        self.lista_disponibles.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.busqueda = tk.StringVar()
+        ttk.Entry(frame_disponibles, textvariable=self.busqueda).pack(fill=tk.X, padx=10, pady=(10, 0))
+        self.busqueda.trace_add("write", self._programar_filtro)
         
-        ubicaciones = [
-            "Parque Fundidora", "Museo del Acero", "Barrio Antiguo",
-            "Catedral de Monterrey", "Cerro del Obispado", "Estadio BBVA",
-            "Paseo Santa Lucía", "Museo de Historia Mexicana"
-        ]
-        for ubi in ubicaciones:
-            self.lista_disponibles.insert(tk.END, ubi)
+        self.lista_disponibles = ListaVirtual(frame_disponibles, width=25, height=10)
+        self.lista_disponibles.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.lista_disponibles.establecer(self.filtro.filtrar(""))
         
         frame_botones = ttk.Frame(self.frame)
         frame_botones.grid(row=2, column=1, padx=10, pady=10, sticky="n")
@@ -220,50 +2138,82 @@ class InterfazTurismo(tk.Tk):
         self.resultado.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         self.resultado.insert(tk.END, "Seleccione destinos y calcule la ruta óptima...")
         
+        self.estado = tk.StringVar()
+        ttk.Label(self.frame, textvariable=self.estado, anchor="w").grid(row=4, column=0, columnspan=3,
+                                                                        sticky="ew", padx=10)
+        
         self.frame.columnconfigure(0, weight=1)
         self.frame.columnconfigure(2, weight=1)
         self.frame.rowconfigure(2, weight=1)
     
+    def _mostrar_estado(self, texto: str, segundos: float = 4):
+        """Mensaje en la barra de estado que se borra solo (sin ventanas modales)."""
+        self.estado.set(texto)
+        if self._estado_pendiente is not None:
+            self.after_cancel(self._estado_pendiente)
+        self._estado_pendiente = self.after(int(segundos * 1000), self.estado.set, "")
+    
+    def _programar_filtro(self, *_):
+        # Se filtra cuando el usuario deja de escribir 150 ms, no en cada tecla
+        if self._filtro_pendiente is not None:
+            self.after_cancel(self._filtro_pendiente)
+        self._filtro_pendiente = self.after(150, self._aplicar_filtro)
+    
+    def _aplicar_filtro(self):
+        self._filtro_pendiente = None
+        texto = self.busqueda.get()
+        resultados = self.filtro.filtrar(texto)
+        self.lista_disponibles.establecer(resultados)
+        if resultados or not texto.strip():
+            self._mostrar_estado(f"{len(resultados)} de {len(self.filtro)} ubicaciones")
+            return
+        sugerencias = self.filtro.sugerencias(texto)
+        if sugerencias:
+            self._mostrar_estado(f"Sin coincidencias. ¿Quiso decir: {', '.join(sugerencias)}?")
+        else:
+            self._mostrar_estado("Sin coincidencias")
+    
     def _añadir_ubicacion(self):
         if self.lista_seleccionadas.size() >= 6: 
-            messagebox.showwarning("Límite Alcanzado", "Máximo 5 destinos permitidos")
+            self._mostrar_estado("Máximo 5 destinos permitidos")
             return
         
-        seleccion = self.lista_disponibles.curselection()
-        if not seleccion:
-            messagebox.showwarning("Nada Seleccionado", "Seleccione una ubicación de la lista izquierda")
+        nombre = self.lista_disponibles.seleccion()
+        if nombre is None:
+            self._mostrar_estado("Seleccione una ubicación de la lista izquierda")
             return
         
-        nombre = self.lista_disponibles.get(seleccion[0])
         resultado = self.grafo.agregar_ubicacion(nombre)
         
         if "Error" not in resultado:
             self.lista_seleccionadas.insert(tk.END, nombre)
-            self.lista_disponibles.delete(seleccion[0])
+            self.filtro.ocultar(nombre)
+            self.lista_disponibles.quitar(nombre)
         
-        messagebox.showinfo("Resultado", resultado)
+        self._mostrar_estado(resultado)
     
     def _eliminar_ubicacion(self):
         seleccion = self.lista_seleccionadas.curselection()
         if not seleccion:
-            messagebox.showwarning("Nada Seleccionado", "Seleccione una ubicación de la lista derecha")
+            self._mostrar_estado("Seleccione una ubicación de la lista derecha")
             return
         
         nombre = self.lista_seleccionadas.get(seleccion[0])
         
         # No permitir eliminar Macroplaza
         if "Macroplaza" in nombre:
-            messagebox.showinfo("Información", "Macroplaza no se puede eliminar")
+            self._mostrar_estado("Macroplaza no se puede eliminar")
             return
         
         resultado = self.grafo.eliminar_ubicacion(nombre)
-        self.lista_disponibles.insert(tk.END, nombre)
         self.lista_seleccionadas.delete(seleccion[0])
-        messagebox.showinfo("Resultado", resultado)
+        self.filtro.mostrar(nombre)
+        self.lista_disponibles.establecer(self.filtro.filtrar(self.busqueda.get()))
+        self._mostrar_estado(resultado)
     
     def _dibujar_mapa(self):
         if len(self.grafo.nodos) < 2:
-            messagebox.showwarning("Mapa Vacío", "Añada destinos primero")
+            self._mostrar_estado("Añada destinos primero")
             return
         
         self.grafo.conectar_ubicaciones_densamente(self.distancias_predefinidas)
@@ -381,7 +2331,474 @@ class InterfazTurismo(tk.Tk):
         plt.tight_layout()
         plt.show()
 
+def benchmark_csr(n_nodos: int = 200_000, grado: int = 8):
+    """Compara el tiempo de carga del archivo CSR con reconstruir la red en memoria.
+
+    El archivo se escribe en una carpeta temporal que se borra al terminar.
+    """
+    rng = np.random.default_rng(0)
+    nombres = [f"Ubicacion {i:07d}" for i in range(n_nodos)]
+    destinos = rng.integers(0, n_nodos, size=n_nodos * grado, dtype=np.int32)
+    pesos = np.round(rng.uniform(0.1, 10.0, size=n_nodos * grado), 1)
+    desplazamientos = np.arange(0, n_nodos * grado + 1, grado, dtype=np.int64)
+    coordenadas = rng.random((n_nodos, 2))
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "red_benchmark.csr")
+        inicio = time.perf_counter()
+        escribir_csr_arreglos(ruta, nombres, desplazamientos, destinos, pesos, coordenadas)
+        print(f"Escritura: {time.perf_counter() - inicio:.3f} s")
+
+        inicio = time.perf_counter()
+        adyacencia = defaultdict(dict)
+        for i in range(n_nodos):
+            for k in range(i * grado, (i + 1) * grado):
+                adyacencia[nombres[i]][nombres[destinos[k]]] = float(pesos[k])
+        print(f"Reconstrucción en memoria: {time.perf_counter() - inicio:.3f} s")
+
+        inicio = time.perf_counter()
+        red = GrafoCSR(ruta)
+        print(f"Carga con memmap: {(time.perf_counter() - inicio) * 1000:.3f} ms")
+
+        inicio = time.perf_counter()
+        for i in range(0, n_nodos, n_nodos // 1000):
+            red.vecinos(nombres[i])
+        print(f"1000 consultas de vecinos: {(time.perf_counter() - inicio) * 1000:.3f} ms")
+
+        inicio = time.perf_counter()
+        GrafoCSR(ruta, verificar=True)
+        print(f"Carga con verificación de checksum: {(time.perf_counter() - inicio) * 1000:.3f} ms")
+        del red  # Suelta el memmap antes de borrar la carpeta
+
+
+def _conectar_vecinos_cercanos(grafo, nombres, vecinos: int = 8):
+    """Crea calles (en ambos sentidos) de cada ubicación hacia sus ``vecinos`` más cercanos."""
+    coordenadas = np.array([grafo.posiciones[n] for n in nombres])
+    distancias = np.sqrt(((coordenadas[:, None, :] - coordenadas[None, :, :]) ** 2).sum(axis=2)) * 3
+    for i, cercanos in enumerate(np.argsort(distancias, axis=1)[:, 1:vecinos + 1]):
+        for j in cercanos:
+            grafo.distancias[nombres[i]][nombres[j]] = grafo.distancias[nombres[j]][nombres[i]] = distancias[i, j]
+
+
+def benchmark_guias(n_sitios: int = 2000, k: int = 8):
+    """Mide el tiempo de ``calcular_rutas_guias`` con distinto número de procesos."""
+    rng = np.random.default_rng(0)
+    grafo = GrafoTurismo()
+    destinos = [f"Sitio {i:04d}" for i in range(n_sitios)]
+    for nombre, (x, y) in zip(destinos, rng.random((n_sitios, 2))):
+        grafo.posiciones[nombre] = (float(x), float(y))
+    _conectar_vecinos_cercanos(grafo, ["Macroplaza"] + destinos)
+
+    procesos = 1
+    while procesos <= k:
+        inicio = time.perf_counter()
+        rutas, distancias = grafo.calcular_rutas_guias(k, destinos, procesos=procesos)
+        segundos = time.perf_counter() - inicio
+        print(f"{procesos:>2} procesos: {segundos:.3f} s, distancia total {sum(distancias):.1f} km, "
+              f"ubicaciones por ruta (con intermedias) {[len(r) - 2 for r in rutas]}")
+        procesos *= 2
+
+
+def benchmark_multiarranque(n_sitios: int = 150, intentos: int = 64, max_procesos: int = 8):
+    """Mide ``calcular_ruta_multiarranque`` con distinto número de procesos."""
+    rng = np.random.default_rng(0)
+    grafo = GrafoTurismo()
+    destinos = [f"Sitio {i:04d}" for i in range(n_sitios)]
+    for nombre, (x, y) in zip(destinos, rng.random((n_sitios, 2))):
+        grafo.posiciones[nombre] = (float(x), float(y))
+    _conectar_vecinos_cercanos(grafo, ["Macroplaza"] + destinos)
+
+    inicio = time.perf_counter()
+    _, distancia = grafo.calcular_ruta_multiarranque(1, destinos=destinos, procesos=1)
+    print(f"Solo vecino más cercano + 2-opt: {time.perf_counter() - inicio:.3f} s, {distancia}")
+    procesos = 1
+    while procesos <= max_procesos:
+        inicio = time.perf_counter()
+        _, distancia = grafo.calcular_ruta_multiarranque(intentos, destinos=destinos, procesos=procesos)
+        print(f"{intentos} arranques, {procesos:>2} procesos: {time.perf_counter() - inicio:.3f} s, {distancia}")
+        procesos *= 2
+
+
+def benchmark_servicio(conexiones: int = 2000, solicitudes_por_conexion: int = 5):
+    """Lanza muchas solicitudes concurrentes contra un ServicioRutas local."""
+    catalogo = sorted({nombre for par in DISTANCIAS_PREDEFINIDAS for nombre in par} - {"Macroplaza"})
+    rng = np.random.default_rng(0)
+
+    async def cliente(puerto, latencias, estados):
+        lector, escritor = await asyncio.open_connection("127.0.0.1", puerto)
+        try:
+            for _ in range(solicitudes_por_conexion):
+                destinos = list(rng.choice(catalogo, size=int(rng.integers(1, 6)), replace=False))
+                inicio = time.perf_counter()
+                estado, _ = await consultar_servicio(lector, escritor, destinos)
+                latencias.append(time.perf_counter() - inicio)
+                estados[estado] = estados.get(estado, 0) + 1
+        finally:
+            escritor.close()
+
+    async def principal():
+        servicio = await ServicioRutas(puerto=0).iniciar()
+        latencias, estados = [], {}
+        inicio = time.perf_counter()
+        await asyncio.gather(*(cliente(servicio.puerto, latencias, estados) for _ in range(conexiones)))
+        segundos = time.perf_counter() - inicio
+        latencias.sort()
+        print(f"{len(latencias)} solicitudes desde {conexiones} conexiones concurrentes en {segundos:.2f} s "
+              f"({len(latencias) / segundos:.0f} sol/s)")
+        print(f"Cliente: p50 {latencias[len(latencias) // 2] * 1000:.1f} ms, "
+              f"p99 {latencias[int(len(latencias) * 0.99)] * 1000:.1f} ms; estados {estados}")
+        print(f"Servidor: {servicio.estadisticas()}")
+        await servicio.cerrar()
+
+    asyncio.run(principal())
+
+
+def benchmark_sesiones(n_ubicaciones: int = 20_000, sesiones: int = 200):
+    """Compara la memoria por sesión de GrafoTurismo independientes contra SesionTurismo sobre una base."""
+    rng = np.random.default_rng(0)
+    nombres = ["Macroplaza"] + [f"Sitio {i:05d}" for i in range(n_ubicaciones)]
+    posiciones = {nombre: (float(x), float(y)) for nombre, (x, y) in zip(nombres, rng.random((len(nombres), 2)))}
+    pares = {("Macroplaza", nombre): 2.0 for nombre in nombres[1:]}
+    for _ in range(n_ubicaciones * 3):
+        a, b = rng.integers(1, len(nombres), size=2)
+        pares[(nombres[a], nombres[b])] = round(float(rng.uniform(0.5, 9.0)), 1)
+    base = GrafoBase(pares, posiciones)
+    selecciones = [list(rng.choice(nombres[1:], size=5, replace=False)) for _ in range(sesiones)]
+
+    def crear_independiente(seleccion):
+        grafo = GrafoTurismo()
+        grafo.posiciones = dict(posiciones)
+        grafo.distancias = defaultdict(dict, {o: dict(v) for o, v in base.adyacencia.items()})
+        for nombre in seleccion:
+            grafo.agregar_ubicacion(nombre)
+        grafo.conectar_ubicaciones_densamente({})
+        return grafo
+
+    def crear_sesion(seleccion):
+        sesion = SesionTurismo(base)
+        for nombre in seleccion:
+            sesion.agregar_ubicacion(nombre)
+        sesion.conectar_ubicaciones_densamente()
+        return sesion
+
+    for etiqueta, crear in (("GrafoTurismo con copia de la red", crear_independiente),
+                            ("SesionTurismo sobre GrafoBase", crear_sesion)):
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        grafos = [crear(seleccion) for seleccion in selecciones]
+        segundos = time.perf_counter() - inicio
+        memoria, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{etiqueta:<34}{memoria / sesiones / 1024:>10.1f} KiB/sesión{segundos * 1000 / sesiones:>9.2f} ms/sesión")
+        del grafos
+
+
+def _cuadricula(lado: int, rng):
+    """Cuadrícula de calles ``lado`` x ``lado`` con pesos aleatorios, como ``{cruce: {cruce: peso}}``."""
+    adyacencia = defaultdict(dict)
+    for i in range(lado):
+        for j in range(lado):
+            for di, dj in ((1, 0), (0, 1)):
+                if i + di < lado and j + dj < lado:
+                    peso = round(float(rng.uniform(0.1, 1.0)), 2)
+                    adyacencia[(i, j)][(i + di, j + dj)] = peso
+                    adyacencia[(i + di, j + dj)][(i, j)] = peso
+    return {f"Cruce {i:03d}-{j:03d}": {f"Cruce {a:03d}-{b:03d}": w for (a, b), w in vecinos.items()}
+            for (i, j), vecinos in adyacencia.items()}
+
+
+def benchmark_jerarquia(lado: int = 100, consultas: int = 200, tabla: int = 50):
+    """Compara la jerarquía de contracción con Dijkstra simple sobre una cuadrícula de calles."""
+    rng = np.random.default_rng(0)
+    adyacencia = _cuadricula(lado, rng)
+    nombres = sorted(adyacencia)
+
+    inicio = time.perf_counter()
+    jerarquia = JerarquiaContraccion.construir(adyacencia)
+    print(f"Preprocesamiento ({len(nombres)} nodos): {time.perf_counter() - inicio:.2f} s, "
+          f"{len(jerarquia.destinos)} aristas ascendentes")
+
+    pares = [(nombres[a], nombres[b]) for a, b in rng.integers(0, len(nombres), size=(consultas, 2))]
+    inicio = time.perf_counter()
+    for origen, destino in pares:
+        dijkstra(adyacencia, origen, destino)
+    t_dijkstra = (time.perf_counter() - inicio) / consultas
+    inicio = time.perf_counter()
+    for origen, destino in pares:
+        jerarquia.ruta(origen, destino)
+    t_jerarquia = (time.perf_counter() - inicio) / consultas
+    print(f"Consulta punto a punto: Dijkstra {t_dijkstra * 1000:.2f} ms, jerarquía {t_jerarquia * 1000:.3f} ms "
+          f"(x{t_dijkstra / t_jerarquia:.0f})")
+
+    seleccion = [nombres[i] for i in rng.choice(len(nombres), size=tabla, replace=False)]
+    inicio = time.perf_counter()
+    for origen in seleccion:
+        dijkstra(adyacencia, origen)
+    t_dijkstra = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    jerarquia.matriz(seleccion)
+    t_jerarquia = time.perf_counter() - inicio
+    print(f"Tabla {tabla}x{tabla}: Dijkstra {t_dijkstra * 1000:.1f} ms, cubetas {t_jerarquia * 1000:.1f} ms "
+          f"(x{t_dijkstra / t_jerarquia:.0f})")
+
+
+def _nombres_sinteticos(n_nombres: int, rng):
+    """Hasta ``n_nombres`` nombres distintos "Tipo Palabra Palabra" con frecuencias de letras del español."""
+    letras = list("eaosrnidlctumpbgvyqhfzjñxkw")
+    frecuencias = np.array([13.7, 12.5, 8.7, 8.0, 6.9, 6.7, 6.2, 5.0, 5.0, 4.7, 4.6, 3.9, 3.2, 2.5,
+                            1.4, 1.0, 0.9, 0.9, 0.9, 0.7, 0.7, 0.5, 0.4, 0.3, 0.2, 0.1, 0.1])
+    frecuencias /= frecuencias.sum()
+    tipos = ["Museo", "Parque", "Calle", "Plaza", "Restaurante", "Hotel", "Café", "Galería", "Iglesia",
+             "Mercado", "Estación"]
+
+    def palabra():
+        return "".join(rng.choice(letras, size=int(rng.integers(4, 11)), p=frecuencias)).capitalize()
+
+    return sorted({f"{tipos[rng.integers(len(tipos))]} {palabra()} {palabra()}" for _ in range(n_nombres)})
+
+
+def benchmark_nombres(n_nombres: int = 100_000, consultas: int = 300):
+    """Mide construcción, autocompletado y búsqueda con errores de IndiceNombres sobre un catálogo sintético."""
+    rng = np.random.default_rng(0)
+    nombres = _nombres_sinteticos(n_nombres, rng)
+    inicio = time.perf_counter()
+    indice = IndiceNombres(nombres)
+    print(f"Construcción ({len(nombres)} nombres, {len(indice._por_palabra)} palabras): "
+          f"{time.perf_counter() - inicio:.2f} s")
+
+    def con_error(texto, errores):
+        for _ in range(errores):
+            i = int(rng.integers(1, len(texto)))
+            texto = texto[:i] + "x" + texto[i + 1:]
+        return texto
+
+    casos = {
+        "autocompletar": (indice.autocompletar, lambda t, a, b: a[:3]),
+        "exacta": (indice.buscar_aproximado, lambda t, a, b: f"{t} {b}".lower()),
+        "1 error": (indice.buscar_aproximado, lambda t, a, b: f"{con_error(a, 1)} {b}"),
+        "2 errores": (indice.buscar_aproximado, lambda t, a, b: f"{con_error(a, 2)} {b}" if len(a) >= 6 else a),
+        "tipo + palabra": (indice.buscar_aproximado, lambda t, a, b: f"{t} {a}"),
+    }
+    for etiqueta, (buscar, consulta) in casos.items():
+        tiempos = []
+        for i in rng.integers(0, len(nombres), size=consultas):
+            texto = consulta(*nombres[i].split())
+            inicio = time.perf_counter()
+            buscar(texto)
+            tiempos.append(time.perf_counter() - inicio)
+        p50, p99 = np.percentile(tiempos, [50, 99]) * 1000
+        print(f"{etiqueta:<16}p50 {p50:6.2f} ms   p99 {p99:6.2f} ms")
+
+    # Eliminar y volver a agregar no debe hacer crecer el vocabulario
+    ids = len(indice._vocabulario)
+    inicio = time.perf_counter()
+    for _ in range(3):
+        for nombre in nombres[:10_000]:
+            indice.eliminar(nombre)
+        for nombre in nombres[:10_000]:
+            indice.agregar(nombre)
+    print(f"3 × eliminar y agregar 10000 nombres: {time.perf_counter() - inicio:.2f} s, "
+          f"ids de palabras {ids} → {len(indice._vocabulario)}")
+
+
+def benchmark_dinamico(lado: int = 100, paradas: int = 100, itinerarios: int = 50, lotes: int = 20,
+                       cambios_por_lote: int = 20):
+    """Compara la reparación incremental de RedDinamica con recalcular Dijkstra desde todos los orígenes."""
+    rng = np.random.default_rng(0)
+    adyacencia = _cuadricula(lado, rng)
+    nombres = sorted(adyacencia)
+    puntos = [nombres[i] for i in rng.choice(len(nombres), size=paradas, replace=False)]
+    red = RedDinamica(adyacencia)
+    inicio = time.perf_counter()
+    for clave in range(itinerarios):
+        seleccion = [puntos[i] for i in rng.choice(paradas, size=5, replace=False)]
+        tour, _ = _resolver_tour(red._matriz_paradas(seleccion))
+        red.registrar_itinerario(clave, [seleccion[i] for i in tour])
+    print(f"Árboles iniciales ({len(red._arboles)} orígenes, {len(nombres)} nodos): "
+          f"{time.perf_counter() - inicio:.2f} s")
+
+    calles = [(u, v) for u in nombres for v in adyacencia[u] if u < v]
+    t_incremental = t_completo = 0.0
+    origenes = obsoletos = suboptimos = 0
+    for _ in range(lotes):
+        lote = {}
+        for i in rng.choice(len(calles), size=cambios_por_lote, replace=False):
+            u, v = calles[i]
+            cierre = rng.random() < 0.05
+            lote[(u, v)] = math.inf if cierre else round(adyacencia[u][v] * float(rng.uniform(0.5, 2.0)), 2)
+        inicio = time.perf_counter()
+        resultado = red.actualizar_pesos(lote)
+        t_incremental += time.perf_counter() - inicio
+        origenes += len(resultado["origenes"])
+        obsoletos += len(resultado["obsoletos"])
+        suboptimos += len(resultado["suboptimos"])
+
+        inicio = time.perf_counter()
+        for origen in red._arboles:
+            dijkstra(red.adyacencia, origen)
+        t_completo += time.perf_counter() - inicio
+    print(f"Por lote de {cambios_por_lote} cambios: incremental {t_incremental * 1000 / lotes:.1f} ms, "
+          f"recalcular todo {t_completo * 1000 / lotes:.1f} ms (x{t_completo / t_incremental:.1f})")
+    print(f"Por lote: {origenes / lotes:.1f} orígenes reparados de {len(red._arboles)}, "
+          f"{obsoletos / lotes:.1f} itinerarios obsoletos y {suboptimos / lotes:.1f} subóptimos de {itinerarios}")
+
+
+def benchmark_evaluacion(n_sitios: int = 300, cerradas: float = 0.002, recorridos: int = 200_000,
+                         conjuntos: int = 2000):
+    """Mide la evaluación en bloque de recorridos contra recorrerlos uno por uno en Python."""
+    rng = np.random.default_rng(0)
+    grafo = GrafoTurismo()
+    sitios = ["Macroplaza"] + [f"Sitio {i:03d}" for i in range(n_sitios)]
+    coordenadas = rng.random((len(sitios), 2))
+    distancias = np.sqrt(((coordenadas[:, None, :] - coordenadas[None, :, :]) ** 2).sum(axis=2)) * 3
+    # Red completa salvo una fracción de calles cerradas, que producen violaciones
+    abiertas = rng.random(distancias.shape) >= cerradas
+    for i, j in zip(*np.nonzero(np.triu(abiertas, 1))):
+        grafo.distancias[sitios[i]][sitios[j]] = grafo.distancias[sitios[j]][sitios[i]] = round(distancias[i, j], 1)
+    grafo.nodos.update(sitios)
+
+    # Los socios proponen distintos órdenes para un número limitado de selecciones de paradas
+    selecciones = [rng.choice(sitios[1:], size=int(rng.integers(4, 10)), replace=False).tolist()
+                   for _ in range(conjuntos)]
+    itinerarios = [["Macroplaza"] + rng.permutation(selecciones[k]).tolist() + ["Macroplaza"]
+                   for k in rng.integers(0, conjuntos, size=recorridos)]
+    tramos = sum(len(itinerario) - 1 for itinerario in itinerarios)
+
+    muestra = itinerarios[:20_000]
+    inicio = time.perf_counter()
+    for itinerario in muestra:
+        longitud = faltantes = 0
+        for a, b in zip(itinerario, itinerario[1:]):
+            if b in grafo.distancias.get(a, {}):
+                longitud += grafo.distancias[a][b]
+            else:
+                faltantes += 1
+    t_bucle = (time.perf_counter() - inicio) * len(itinerarios) / len(muestra)
+
+    inicio = time.perf_counter()
+    grafo.evaluar_itinerarios(itinerarios, referencia=False)
+    t_bloque = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    resultado = grafo.evaluar_itinerarios(itinerarios)
+    t_referencia = time.perf_counter() - inicio
+    validos = np.isfinite(resultado["mejora"])
+    print(f"{recorridos} recorridos, {tramos} tramos")
+    print(f"Bucle en Python (estimado): {t_bucle:.2f} s ({tramos / t_bucle / 1e6:.2f} M tramos/s)")
+    print(f"evaluar_itinerarios:        {t_bloque:.2f} s ({tramos / t_bloque / 1e6:.2f} M tramos/s, "
+          f"x{t_bucle / t_bloque:.0f})")
+    print(f"Con referencia del solver:  {t_referencia:.2f} s; {int(validos.sum())} recorridos válidos, "
+          f"mejora media {np.mean(resultado['mejora'][validos]) if validos.any() else 0:.1f} km")
+
+    arreglo, _ = _arreglo_itinerarios(itinerarios, {n: i for i, n in enumerate(sitios)}, len(sitios),
+                                      len(sitios) + 1)
+    matriz = np.zeros((len(sitios) + 2, len(sitios) + 2))
+    inicio = time.perf_counter()
+    _puntuar_itinerarios(arreglo, matriz)
+    t_nucleo = time.perf_counter() - inicio
+    print(f"Solo el cálculo NumPy:      {t_nucleo * 1000:.0f} ms ({tramos / t_nucleo / 1e6:.1f} M tramos/s)")
+
+
+def benchmark_interfaz(n_ubicaciones: int = 50_000, consultas: int = 100):
+    """Mide el filtrado incremental sobre ``n_ubicaciones`` y, si hay pantalla, el primer dibujado,
+    el desplazamiento y la selección de la interfaz (p. ej. ``xvfb-run python "Proyecto v3.py" --benchmark interfaz``).
+    """
+    rng = np.random.default_rng(0)
+    catalogo = _nombres_sinteticos(n_ubicaciones, rng)
+    inicio = time.perf_counter()
+    filtro = FiltroUbicaciones(catalogo)
+    print(f"Índice normalizado ({len(catalogo)} ubicaciones): {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+    # Se escribe letra por letra parte de un nombre y luego se borran tres letras
+    escritura, borrado = [], []
+    for i in rng.integers(0, len(catalogo), size=consultas):
+        texto = catalogo[i].split(" ", 1)[1][:8]
+        for k in range(1, len(texto) + 1):
+            inicio = time.perf_counter()
+            filtro.filtrar(texto[:k])
+            escritura.append(time.perf_counter() - inicio)
+        for k in range(len(texto) - 1, len(texto) - 4, -1):
+            inicio = time.perf_counter()
+            filtro.filtrar(texto[:k])
+            borrado.append(time.perf_counter() - inicio)
+    for etiqueta, tiempos in (("Filtro al escribir", escritura), ("Filtro al borrar", borrado)):
+        p50, p99, maximo = np.percentile(tiempos, [50, 99, 100]) * 1000
+        print(f"{etiqueta:<20}p50 {p50:6.2f} ms   p99 {p99:6.2f} ms   máx {maximo:6.2f} ms")
+
+    try:
+        inicio = time.perf_counter()
+        app = InterfazTurismo(catalogo)
+        app.update()
+    except tk.TclError as error:
+        print(f"Sin pantalla; no se mide el primer dibujado ({error})")
+        return
+    print(f"Primer dibujado con ListaVirtual: {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+    inicio = time.perf_counter()
+    ventana = tk.Toplevel(app)
+    lista = tk.Listbox(ventana)
+    lista.pack()
+    for nombre in catalogo:
+        lista.insert(tk.END, nombre)
+    ventana.update()
+    print(f"Listbox con todas las ubicaciones (antes): {(time.perf_counter() - inicio) * 1000:.0f} ms")
+    ventana.destroy()
+
+    tiempos = []
+    for texto in ("m", "mu", "mus", "muse", "museo", "museo a", "museo", ""):
+        inicio = time.perf_counter()
+        app.busqueda.set(texto)
+        app._aplicar_filtro()
+        app.update_idletasks()
+        tiempos.append(time.perf_counter() - inicio)
+    print(f"Filtro y redibujado: máx {max(tiempos) * 1000:.1f} ms")
+
+    # Desplazamiento por la barra, por páginas y con la rueda sobre el catálogo completo
+    lista = app.lista_disponibles
+    tiempos = []
+    for accion in [("moveto", "0.5")] + [("scroll", "1", "pages")] * 20 + [("scroll", "3", "units")] * 20 \
+            + [("moveto", "1.0"), ("moveto", "0.0")]:
+        inicio = time.perf_counter()
+        lista._desplazar(*accion)
+        app.update_idletasks()
+        tiempos.append(time.perf_counter() - inicio)
+    print(f"Desplazamiento ({len(tiempos)} pasos): máx {max(tiempos) * 1000:.1f} ms")
+
+    # Selección con clic y con el teclado; debe seguir visible y coincidir con el elemento
+    lista._desplazar("moveto", "0.5")
+    lista.lista.selection_set(0)
+    lista._al_seleccionar(None)
+    esperado = lista.inicio
+    inicio = time.perf_counter()
+    for _ in range(3 * lista._filas_visibles()):
+        lista._mover(1)
+        esperado += 1
+    app.update_idletasks()
+    visible = lista.lista.curselection() == (lista.indice - lista.inicio,)
+    correcta = lista.seleccion() == lista.elementos[esperado] and lista.indice == esperado
+    print(f"Selección con el teclado: {(time.perf_counter() - inicio) * 1000:.0f} ms, "
+          f"{'correcta' if correcta else 'INCORRECTA'} y {'visible' if visible else 'NO visible'}")
+    app.destroy()
+
+
+BENCHMARKS = {
+    "csr": benchmark_csr,
+    "guias": benchmark_guias,
+    "multiarranque": benchmark_multiarranque,
+    "servicio": benchmark_servicio,
+    "sesiones": benchmark_sesiones,
+    "jerarquia": benchmark_jerarquia,
+    "nombres": benchmark_nombres,
+    "dinamico": benchmark_dinamico,
+    "evaluacion": benchmark_evaluacion,
+    "interfaz": benchmark_interfaz,
+}
+
 # Iniciar la aplicación
 if __name__ == "__main__":
-    app = InterfazTurismo()
-    app.mainloop()
\ No newline at end of file
+    if len(sys.argv) > 2 and sys.argv[1] == "--benchmark":
+        BENCHMARKS[sys.argv[2]]()
+    elif len(sys.argv) > 1 and sys.argv[1] == "--servicio":
+        ServicioRutas(puerto=int(sys.argv[2]) if len(sys.argv) > 2 else 8080).ejecutar()
+    else:
+        app = InterfazTurismo()
+        app.mainloop()
\ No newline at end of file
@@ -0,0 +1,147 @@
+"""
+**Consultas en lote sobre arreglos CSR**
+
+Funciones compartidas por "Proyecto v1.py" y "Proyecto v2.py" para resolver
+muchos pares (origen, destino) con BFS agrupados por origen, en uno o varios
+procesos. Viven en un módulo propio para que los trabajadores de
+ProcessPoolExecutor puedan importarlas.
+"""
+import os
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+_CSR_TRABAJADOR = None
+
+def iniciarTrabajador(desplazamientos, destinos):
+    """**Función iniciarTrabajador**
+    
+    Guarda los arreglos CSR una sola vez por proceso trabajador.
+    """
+    global _CSR_TRABAJADOR
+    _CSR_TRABAJADOR = (desplazamientos, destinos)
+
+def transponer(desplazamientos, destinos):
+    """**Función transponer**
+    
+    Invierte el sentido de todas las rutas de unos arreglos CSR.
+    """
+    n = len(desplazamientos) - 1
+    grados = array("q", [0]) * (n + 1)
+    for j in destinos:
+        grados[j + 1] += 1
+    for i in range(n):
+        grados[i + 1] += grados[i]
+    invertidos = array("i", [0]) * len(destinos)
+    posicion = array("q", grados)
+    for i in range(n):
+        for k in range(desplazamientos[i], desplazamientos[i + 1]):
+            j = destinos[k]
+            invertidos[posicion[j]] = i
+            posicion[j] += 1
+    return grados, invertidos
+
+def bfsMultiorigen(desplazamientos, destinos, origenes):
+    """**Función bfsMultiorigen**
+    
+    BFS simultáneo desde varios orígenes sobre arreglos CSR.
+    
+    Returns:
+        tuple: (origen más cercano, saltos) por id, con -1 si no se alcanza.
+    """
+    n = len(desplazamientos) - 1
+    origen = array("i", [-1]) * n
+    saltos = array("i", [-1]) * n
+    cola = deque()
+    for i in origenes:
+        if origen[i] == -1:
+            origen[i] = i
+            saltos[i] = 0
+            cola.append(i)
+    while cola:
+        actual = cola.popleft()
+        for k in range(desplazamientos[actual], desplazamientos[actual + 1]):
+            vecino = destinos[k]
+            if origen[vecino] == -1:
+                origen[vecino] = origen[actual]
+                saltos[vecino] = saltos[actual] + 1
+                cola.append(vecino)
+    return origen, saltos
+
+def resolverGrupos(tarea, csr=None):
+    """**Función resolverGrupos**
+    
+    Resuelve grupos [(origen, [destinos])] con un BFS por origen que se
+    detiene al alcanzar el último destino pendiente.
+    """
+    conRutas, grupos = tarea
+    desplazamientos, destinos = csr or _CSR_TRABAJADOR
+    resultados = []
+    padres = array("i", [-1]) * (len(desplazamientos) - 1)
+    for origen, objetivos in grupos:
+        visitados = [origen]
+        padres[origen] = origen
+        pendientes = set(objetivos)
+        pendientes.discard(origen)
+        cola = deque([origen])
+        while cola and pendientes:
+            actual = cola.popleft()
+            for k in range(desplazamientos[actual], desplazamientos[actual + 1]):
+                vecino = destinos[k]
+                if padres[vecino] == -1:
+                    padres[vecino] = actual
+                    visitados.append(vecino)
+                    cola.append(vecino)
+                    pendientes.discard(vecino)
+        for destino in objetivos:
+            if padres[destino] == -1:
+                resultados.append((origen, destino, None))
+                continue
+            ruta = [destino]
+            while ruta[-1] != origen:
+                ruta.append(padres[ruta[-1]])
+            resultados.append((origen, destino, ruta[::-1] if conRutas else len(ruta) - 1))
+        for i in visitados:
+            padres[i] = -1
+    return resultados
+
+def consultasLote(pares, nombres, ids, desplazamientos, destinos, procesos, conRutas):
+    """**Función consultasLote**
+    
+    Agrupa los pares por origen, reparte los grupos y entrega los resultados
+    con nombres a medida que llegan. Solo hay unas pocas tareas en vuelo a la
+    vez, así que la memoria no crece con el tamaño del lote.
+    """
+    grupos = {}
+    for origen, destino in pares:
+        if origen not in ids or destino not in ids:
+            yield origen, destino, None
+            continue
+        grupos.setdefault(ids[origen], []).append(ids[destino])
+    grupos = list(grupos.items())
+
+    def traducir(resultados):
+        for origen, destino, resultado in resultados:
+            if conRutas and resultado is not None:
+                resultado = [nombres[i] for i in resultado]
+            yield nombres[origen], nombres[destino], resultado
+
+    procesos = procesos or os.cpu_count() or 1
+    tamano = max(1, min(256, len(grupos) // (procesos * 4)))
+    tareas = ((conRutas, grupos[k:k + tamano]) for k in range(0, len(grupos), tamano))
+    if procesos == 1 or len(grupos) <= tamano:
+        for tarea in tareas:
+            yield from traducir(resolverGrupos(tarea, (desplazamientos, destinos)))
+        return
+
+    with ProcessPoolExecutor(max_workers=procesos, initializer=iniciarTrabajador,
+                             initargs=(desplazamientos, destinos)) as ejecutor:
+        en_vuelo = set()
+        for tarea in tareas:
+            en_vuelo.add(ejecutor.submit(resolverGrupos, tarea))
+            if len(en_vuelo) >= 2 * procesos:
+                listos, en_vuelo = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                for futuro in listos:
+                    yield from traducir(futuro.result())
+        for futuro in en_vuelo:
+            yield from traducir(futuro.result())